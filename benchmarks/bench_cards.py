@@ -0,0 +1,137 @@
+# Card view benchmark for PwKeeper: one widget per card vs the virtualized grid
+# Run from the repository root: python -m benchmarks.bench_cards
+# (set QT_QPA_PLATFORM=offscreen to run without a display)
+
+import time
+
+from PySide6.QtWidgets import QApplication, QWidget
+
+from src.core.models import Credential
+from src.ui.card_view import CardViewWidget
+
+VAULT_SIZES = (200, 1000, 3000)
+
+# Vault size for the single-edit benchmark
+EDIT_VAULT_SIZE = 5000
+
+# Successive filters, as while typing a search (and then clearing it)
+KEYSTROKES = ("1", "12", "1", "", "2", "")
+
+
+def make_credentials(count):
+    return [
+        Credential(i, "General", f"site-{i:05d}", f"user{i}@example.com", b"ciphertext",
+                   i % 7 == 0, f"https://site-{i}.example.com", "note" if i % 5 == 0 else "")
+        for i in range(1, count + 1)
+    ]
+
+
+def settle(app):
+    """Let delayed layouts and paints finish before timing"""
+    for _ in range(3):
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def render(app, count, virtualize):
+    """Seconds for set_data plus the first paint, and the widgets it created"""
+    view = CardViewWidget()
+    view.VIRTUALIZE_THRESHOLD = 0 if virtualize else float("inf")
+    view.resize(1000, 700)
+    view.show()
+    app.processEvents()
+
+    credentials = make_credentials(count)
+    start = time.perf_counter()
+    view.set_data(credentials)
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    widgets = len(view.findChildren(QWidget))
+    view.close()
+    view.deleteLater()
+    app.processEvents()
+    return elapsed, widgets
+
+
+def filter_as_typed(app, rebuild):
+    """Average ms per keystroke filtering 200 widget cards"""
+    view = CardViewWidget()
+    view.resize(1000, 700)
+    view.show()
+    credentials = make_credentials(view.VIRTUALIZE_THRESHOLD)
+    view.set_data(credentials)
+    settle(app)
+
+    start = time.perf_counter()
+    for text in KEYSTROKES:
+        if rebuild:
+            view._clear_cards()  # What every set_data did before the pool
+        view.set_data([c for c in credentials if text in c.site_name])
+        app.processEvents()
+    elapsed = (time.perf_counter() - start) / len(KEYSTROKES)
+
+    view.close()
+    view.deleteLater()
+    app.processEvents()
+    return elapsed
+
+
+def edit_one(app, count, diff):
+    """ms to re-render after one credential is edited, set_data with the full list"""
+    from src.core.models import Credential
+
+    view = CardViewWidget()
+    view.resize(1000, 700)
+    view.show()
+    credentials = make_credentials(count)
+    view.set_data(credentials)
+    settle(app)
+
+    edited = list(credentials)
+    old = edited[count // 2]
+    edited[count // 2] = Credential(old.id, old.category, old.site_name, "renamed@example.com",
+                                    old.encrypted_password, old.is_favorite, old.url, old.notes)
+    start = time.perf_counter()
+    if not diff:
+        # What set_data did before diffing
+        if view.virtualized:
+            view.current_data = edited
+            view.grid_model.set_credentials(edited)
+        else:
+            view._clear_cards()
+            view.set_data(edited)
+    else:
+        view.set_data(edited)
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    view.close()
+    view.deleteLater()
+    app.processEvents()
+    return elapsed
+
+
+def main():
+    app = QApplication.instance() or QApplication([])
+    print(f"{'cards':>8}{'widgets ms':>13}{'grid ms':>10}{'widgets':>10}{'grid':>8}")
+    for count in VAULT_SIZES:
+        widget_time, widget_count = render(app, count, virtualize=False)
+        grid_time, grid_count = render(app, count, virtualize=True)
+        print(f"{count:>8,}{widget_time * 1e3:>13,.0f}{grid_time * 1e3:>10,.1f}"
+              f"{widget_count:>10,}{grid_count:>8,}")
+
+    print()
+    for count in (CardViewWidget.VIRTUALIZE_THRESHOLD, EDIT_VAULT_SIZE):
+        rebuilt = edit_one(app, count, diff=False)
+        diffed = edit_one(app, count, diff=True)
+        print(f"Single edit on {count:,} cards: full re-render {rebuilt * 1e3:,.1f} ms, "
+              f"keyed diff {diffed * 1e3:,.1f} ms")
+
+    rebuilt = filter_as_typed(app, rebuild=True)
+    reused = filter_as_typed(app, rebuild=False)
+    print(f"\nFiltering 200 cards per keystroke: rebuild {rebuilt * 1e3:,.0f} ms, "
+          f"reuse {reused * 1e3:,.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Encryption benchmarks for PwKeeper
+# Run from the repository root: python -m benchmarks.bench_crypto
+
+import os
+import time
+
+from src.core.crypto_manager import (
+    CryptoManager, CryptoSession, FORMAT_FERNET, FORMAT_AES_GCM, FORMAT_CHACHA20
+)
+
+RECORDS = 10_000
+
+
+def time_per_record(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def bench_session_vs_static(key, secrets):
+    """Per-record cost of the static helpers vs a reused CryptoSession"""
+    # Both sides produce Fernet tokens; bench_formats compares formats
+    session = CryptoSession(key, FORMAT_FERNET)
+    # The static helpers take base64 text tokens, the session raw bytes
+    static_tokens = [CryptoManager.encrypt_data(secret, key) for secret in secrets]
+    tokens = [session.encrypt(secret) for secret in secrets]
+
+    rows = [
+        ("encrypt",
+         time_per_record(lambda s: CryptoManager.encrypt_data(s, key), secrets),
+         time_per_record(session.encrypt, secrets)),
+        ("decrypt",
+         time_per_record(lambda t: CryptoManager.decrypt_data(t, key), static_tokens),
+         time_per_record(session.decrypt, tokens)),
+    ]
+    session.close()
+
+    print(f"Per-record cost over {len(secrets):,} records")
+    print(f"{'operation':<12}{'static (us)':>14}{'session (us)':>14}{'speedup':>10}")
+    for label, static, reused in rows:
+        print(f"{label:<12}{static:>14.2f}{reused:>14.2f}{static / reused:>9.2f}x")
+
+
+def bench_batch_throughput(key, secrets):
+    """Records/sec for a serial loop vs encrypt_many/decrypt_many"""
+    session = CryptoSession(key)
+    tokens = session.encrypt_many(secrets).results
+
+    def rate(func):
+        start = time.perf_counter()
+        func()
+        return len(secrets) / (time.perf_counter() - start)
+
+    print(f"\nBatch throughput over {len(secrets):,} records (records/sec)")
+    print(f"{'mode':<22}{'encrypt':>12}{'decrypt':>12}")
+    print(f"{'serial loop':<22}"
+          f"{rate(lambda: [session.encrypt(s) for s in secrets]):>12,.0f}"
+          f"{rate(lambda: [session.decrypt(t) for t in tokens]):>12,.0f}")
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        print(f"{f'batch, {workers} workers':<22}"
+              f"{rate(lambda: session.encrypt_many(secrets, workers)):>12,.0f}"
+              f"{rate(lambda: session.decrypt_many(tokens, workers)):>12,.0f}")
+    session.close()
+
+
+def bench_formats(key, secrets):
+    """Stored size and throughput of Fernet tokens vs the AEAD envelopes"""
+    formats = (("fernet", FORMAT_FERNET), ("aes-256-gcm", FORMAT_AES_GCM),
+               ("chacha20-poly1305", FORMAT_CHACHA20))
+    plain_size = sum(len(s) for s in secrets) / len(secrets)
+
+    print(f"\nCiphertext formats over {len(secrets):,} records (avg plaintext {plain_size:.0f} bytes)")
+    print(f"{'format':<20}{'stored bytes':>14}{'overhead':>10}{'encrypt (us)':>14}{'decrypt (us)':>14}")
+    for label, cipher_format in formats:
+        session = CryptoSession(key, cipher_format)
+        ids = range(len(secrets))
+        tokens = [session.encrypt(s, i) for s, i in zip(secrets, ids)]
+        size = sum(len(t) for t in tokens) / len(tokens)
+        encrypt_us = time_per_record(lambda pair: session.encrypt(*pair), list(zip(secrets, ids)))
+        decrypt_us = time_per_record(lambda pair: session.decrypt(*pair), list(zip(tokens, ids)))
+        print(f"{label:<20}{size:>14.1f}{size / plain_size - 1:>9.0%}"
+              f"{encrypt_us:>14.2f}{decrypt_us:>14.2f}")
+        session.close()
+
+
+def main():
+    key = CryptoManager.derive_key("benchmark", CryptoManager.generate_salt())
+    secrets = [f"password-{i:06d}-Xy!" for i in range(RECORDS)]
+    bench_session_vs_static(key, secrets)
+    bench_batch_throughput(key, secrets * 5)
+    bench_formats(key, secrets)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Database benchmarks for PwKeeper
+# Run from the repository root: python -m benchmarks.bench_db
+
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+
+from src.core.db_manager import DBManager
+
+VAULT_SIZE = 10_000
+ITERATIONS = 200
+
+
+class ConnectPerCallDBManager(DBManager):
+    """Reproduces the old behaviour: a fresh connection for every call."""
+
+    @contextmanager
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            yield cursor
+            conn.commit()
+
+
+def seed_vault(db, size):
+    """Fills the credentials table directly, bypassing the per-row API."""
+    rows = [
+        ("General", f"site-{i:05d}", f"user{i}@example.com", "gAAAAA" + "x" * 100,
+         f"https://site-{i}.example.com", "", 0)
+        for i in range(size)
+    ]
+    with db.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO credentials
+            (category, site_name, username, encrypted_password, url, notes, is_favorite)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+    db.set_setting("master_salt", "00" * 16)
+
+
+def time_per_op(label, func, iterations=ITERATIONS):
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    elapsed = time.perf_counter() - start
+    return label, elapsed / iterations * 1e6
+
+
+def run_operations(db):
+    ids = [row[0] for row in db.get_all_credentials()][:ITERATIONS]
+    return [
+        time_per_op("get_setting", lambda i: db.get_setting("master_salt")),
+        time_per_op("get_credential_by_id_extended",
+                    lambda i: db.get_credential_by_id_extended(ids[i])),
+        time_per_op("toggle_favorite", lambda i: db.toggle_favorite(ids[i])),
+        time_per_op("update_credential_extended",
+                    lambda i: db.update_credential_extended(ids[i], "Work", f"site-{i}", "u", "tok")),
+        time_per_op("add_credential_extended",
+                    lambda i: db.add_credential_extended("General", f"new-{i}", "u", "tok")),
+    ]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name, cls in (("before", ConnectPerCallDBManager), ("after", DBManager)):
+            db = cls(os.path.join(tmp, f"{name}.db"))
+            seed_vault(db, VAULT_SIZE)
+            results[name] = run_operations(db)
+            if name == "after":
+                db.close()
+
+    print(f"Per-operation latency on a {VAULT_SIZE:,}-row vault ({ITERATIONS} iterations)")
+    print(f"{'operation':<32}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for (label, before), (_, after) in zip(results["before"], results["after"]):
+        print(f"{label:<32}{before:>14.1f}{after:>14.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
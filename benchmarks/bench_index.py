@@ -0,0 +1,76 @@
+# In-memory filter and search benchmark for PwKeeper: list scans vs CredentialIndex
+# Run from the repository root: python -m benchmarks.bench_index
+
+import time
+
+from src.core.credential_index import CredentialIndex, words
+from src.core.models import Credential
+
+VAULT_SIZE = 50_000
+ITERATIONS = 50
+
+CATEGORIES = ("General", "Social", "Work", "Finance", "Entertainment")
+
+# (label, category, favorites_only, query)
+CASES = (
+    ("category", "Work", False, ""),
+    ("favorites", None, True, ""),
+    ("search", None, False, "site-01234"),
+    ("search in category", "Finance", False, "user42"),
+    ("search favorites", None, True, "example"),
+)
+
+
+def make_credentials(count):
+    return [
+        Credential(i, CATEGORIES[i % len(CATEGORIES)], f"site-{i:05d}", f"user{i}@example.com",
+                   b"ciphertext", i % 50 == 0, f"https://site-{i}.example.com")
+        for i in range(1, count + 1)
+    ]
+
+
+def scan(rows, category, favorites_only, query):
+    """A list comprehension over all_data, matching words like the index"""
+    phrases = [words(term) for term in query.split()]
+    return [
+        row for row in rows
+        if (category is None or row.category == category)
+        and (row.is_favorite or not favorites_only)
+        and all(any(CredentialIndex._contains(words(text), phrase)
+                    for text in (row.site_name, row.username, row.url, row.notes))
+                for phrase in phrases)
+    ]
+
+
+def time_per_op(func):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    return (time.perf_counter() - start) / ITERATIONS * 1e3
+
+
+def main():
+    rows = make_credentials(VAULT_SIZE)
+    start = time.perf_counter()
+    index = CredentialIndex(rows)
+    build = time.perf_counter() - start
+
+    print(f"Index build for {VAULT_SIZE:,} credentials (on the database worker): {build:.2f} s")
+    print(f"{'query':<22}{'scan (ms)':>12}{'index (ms)':>12}{'rows':>8}")
+    for label, category, favorites_only, query in CASES:
+        if query:
+            def lookup():
+                return index.search(query, category=category, favorites_only=favorites_only)
+        else:
+            def lookup():
+                return index.rows(category, favorites_only)
+        scanned = time_per_op(lambda: scan(rows, category, favorites_only, query))
+        indexed = time_per_op(lookup)
+        print(f"{label:<22}{scanned:>12.2f}{indexed:>12.2f}{len(lookup()):>8,}")
+
+    edited = Credential(rows[0].id, "Work", "renamed", "someone", b"ciphertext")
+    print(f"\nSingle edit: {time_per_op(lambda: index.add(edited)):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
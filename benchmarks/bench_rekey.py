@@ -0,0 +1,75 @@
+# Vault re-encryption benchmark for PwKeeper: migrating a legacy vault to a
+# data key (with a password change) vs a later password change (rewrap)
+# Run from the repository root: python -m benchmarks.bench_rekey
+
+import os
+import tempfile
+import time
+
+from src.core.crypto_manager import CryptoManager, CryptoSession, VERIFIER_TEXT
+from src.core.db_manager import DBManager
+from src.core.rekey import VaultRekey
+from src.core.vault_keys import change_master_password
+
+VAULT_SIZE = 50_000
+BATCH_SIZES = (100, 500, 2000)
+
+
+def seed_vault(db, session, size):
+    """Creates a legacy vault: credentials encrypted with the password key."""
+    salt = CryptoManager.generate_salt()
+    db.set_settings({"master_salt": salt.hex(), "verifier": session.encrypt_text(VERIFIER_TEXT)})
+    db.add_credentials_bulk(
+        ("General", f"site-{i:05d}", f"user{i}@example.com",
+         lambda cred_id, i=i: session.encrypt(f"password-{i:06d}-Xy!", cred_id))
+        for i in range(size)
+    )
+
+
+def bench_rekey(path, batch_size):
+    old = CryptoSession(CryptoManager.derive_key("old", CryptoManager.generate_salt()))
+    db = DBManager(path)
+    seed_vault(db, old, VAULT_SIZE)
+
+    VaultRekey.BATCH_SIZE = batch_size
+    batch_times = []
+    last = time.perf_counter()
+
+    def progress(done, total):
+        nonlocal last
+        now = time.perf_counter()
+        batch_times.append(now - last)
+        last = now
+
+    start = time.perf_counter()
+    rekey = VaultRekey.start(db, old, "new")
+    setup = time.perf_counter() - start
+    last = time.perf_counter()
+    new = rekey.run(progress)
+    elapsed = time.perf_counter() - start
+
+    # Now that credentials are under the data key, change the password again
+    start = time.perf_counter()
+    change_master_password(db, new, "newer")
+    rewrap = time.perf_counter() - start
+
+    new.close()
+    old.close()
+    db.close()
+    return setup, elapsed, max(batch_times), rewrap
+
+
+def main():
+    print(f"Master-password change on a {VAULT_SIZE:,}-entry vault")
+    print(f"{'batch size':<12}{'migrate (s)':>12}{'setup incl. KDF (s)':>21}{'entries/sec':>14}"
+          f"{'slowest batch (ms)':>20}{'rewrap (s)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for batch_size in BATCH_SIZES:
+            path = os.path.join(tmp, f"rekey-{batch_size}.db")
+            setup, elapsed, slowest, rewrap = bench_rekey(path, batch_size)
+            print(f"{batch_size:<12}{elapsed:>12.2f}{setup:>21.2f}"
+                  f"{VAULT_SIZE / elapsed:>14,.0f}{slowest * 1e3:>20.1f}{rewrap:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Ciphertext storage benchmark for PwKeeper: base64 TEXT vs raw BLOB
+# Run from the repository root: python -m benchmarks.bench_storage
+
+import os
+import tempfile
+import time
+
+from src.core.crypto_manager import CryptoManager, CryptoSession
+from src.core.db_manager import DBManager
+
+VAULT_SIZE = 50_000
+
+
+def build_vault(path, session, as_text):
+    """Creates a vault whose ciphertexts are stored as base64 text or raw bytes."""
+    encrypt = session.encrypt_text if as_text else session.encrypt
+    db = DBManager(path)
+    db.add_credentials_bulk(
+        ("General", f"site-{i:05d}", f"user{i}@example.com",
+         lambda cred_id, i=i: encrypt(f"password-{i:06d}-Xy!", cred_id),
+         f"https://site-{i}.example.com")
+        for i in range(VAULT_SIZE)
+    )
+    return db
+
+
+def file_size(db):
+    """Database size once the WAL is folded in and free pages are dropped."""
+    with db.get_connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+    return os.path.getsize(db.db_path)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def measure(db, session):
+    with db.get_connection() as conn:
+        # length() counts characters for text, bytes for blobs; both ASCII-equal here
+        stored = conn.execute("SELECT SUM(length(encrypted_password)) FROM credentials").fetchone()[0]
+    size = file_size(db)
+    rows, load = timed(db.get_all_credentials_extended)
+    _, decrypt = timed(lambda: [session.decrypt(c.encrypted_password, c.id) for c in rows])
+    return stored, size, load, decrypt
+
+
+def main():
+    session = CryptoSession(CryptoManager.derive_key("benchmark", CryptoManager.generate_salt()))
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "text.db")
+        text_db = build_vault(text_path, session, as_text=True)
+        before = measure(text_db, session)
+        blob_db = build_vault(os.path.join(tmp, "blob.db"), session, as_text=False)
+        after = measure(blob_db, session)
+        blob_db.close()
+
+        # Convert the text vault the way an upgrade would
+        with text_db.transaction() as cursor:
+            cursor.execute("PRAGMA user_version = 5")
+        text_db.close()
+        migrated, migration = timed(lambda: DBManager(text_path))
+        migrated.close()
+    session.close()
+
+    print(f"Ciphertext storage on a {VAULT_SIZE:,}-entry vault")
+    print(f"{'metric':<28}{'text':>12}{'blob':>12}{'saving':>10}")
+    for label, scale, unit, b, a in (
+        ("ciphertext column", 1 / 1024, "KiB", before[0], after[0]),
+        ("file size", 1 / 1024, "KiB", before[1], after[1]),
+        ("load all rows", 1e3, "ms", before[2], after[2]),
+        ("decrypt all rows", 1e3, "ms", before[3], after[3]),
+    ):
+        print(f"{f'{label} ({unit})':<28}{b * scale:>12,.0f}{a * scale:>12,.0f}{1 - a / b:>9.0%}")
+    print(f"\nMigrating the text vault to blobs took {migration * 1e3:,.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
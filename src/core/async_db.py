@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, Signal
+
+
+class AsyncDBManager(QObject):
+    """
+    Runs DBManager calls on a dedicated worker thread so the GUI thread never
+    waits on SQLite. Calls execute one at a time in submission order, and
+    results are delivered back on the GUI thread through callbacks.
+
+    The main window makes every database call through this worker. Startup
+    code in main.py still reads a few settings directly, before the window
+    exists; DBManager's lock keeps that safe on the shared connection.
+    Once shutdown() has started, new calls and pending callbacks are dropped.
+    """
+    busy_changed = Signal(bool)  # True while any call is pending
+    failed = Signal(object)  # exception from a call without an error_callback
+
+    # Internal: carries a finished future back to the GUI thread
+    _finished = Signal(object, object, object)  # future, callback, error_callback
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.pending = 0
+        self.closing = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pwkeeper-db")
+        self._finished.connect(self._on_finished)
+
+        # Reopen the shared connection on the worker, where the window's calls run
+        self.db_manager.close()
+
+    def call(self, method: str, *args, callback=None, error_callback=None, **kwargs):
+        """
+        Run db_manager.<method>(*args, **kwargs) on the worker thread.
+
+        Args:
+            method: Name of the DBManager method
+            callback: Called on the GUI thread with the result
+            error_callback: Called on the GUI thread with the exception
+
+        Returns:
+            concurrent.futures.Future for the result
+        """
+        return self.submit(lambda db: getattr(db, method)(*args, **kwargs),
+                           callback=callback, error_callback=error_callback)
+
+    def submit(self, func, callback=None, error_callback=None):
+        """
+        Run func(db_manager) on the worker thread. Use this to group several
+        DBManager calls into one round trip.
+
+        Returns:
+            concurrent.futures.Future for the result, or None after shutdown()
+        """
+        if self.closing:
+            return None  # e.g. a timer or callback firing as the window closes
+        self._set_pending(self.pending + 1)
+        future = self._executor.submit(func, self.db_manager)
+        future.add_done_callback(lambda f: self._finished.emit(f, callback, error_callback))
+        return future
+
+    def deliver(self, future, callback=None, error_callback=None):
+        """
+        Also deliver the result of a future from submit() (e.g. one started
+        before its consumer existed) to callbacks on the GUI thread, without
+        waiting for it.
+        """
+        if self.closing:
+            return
+        self._set_pending(self.pending + 1)
+        future.add_done_callback(lambda f: self._finished.emit(f, callback, error_callback))
+
+    def shutdown(self):
+        """Wait for queued calls to finish and stop the worker thread"""
+        self.closing = True
+        self._executor.shutdown(wait=True)
+
+    def _on_finished(self, future, callback, error_callback):
+        """Deliver a result on the GUI thread"""
+        self._set_pending(self.pending - 1)
+        if self.closing:
+            return  # The callbacks' widgets are going away
+
+        error = future.exception()
+        if error is not None:
+            if error_callback:
+                error_callback(error)
+            else:
+                self.failed.emit(error)
+        elif callback:
+            callback(future.result())
+
+    def _set_pending(self, count):
+        was_busy = self.pending > 0
+        self.pending = count
+        if was_busy != (count > 0):
+            self.busy_changed.emit(count > 0)
@@ -0,0 +1,310 @@
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+from src.core.field_crypto import normalize_domain, normalize_username
+
+# Runs of letters and digits, like FTS5's default unicode61 tokenizer
+_WORD = re.compile(r"[^\W_]+")
+
+
+def words(text: str) -> tuple:
+    """
+    Words of text as the full-text index sees them: split on anything but
+    letters and digits, lowercase and without diacritics.
+    """
+    if not text:
+        return ()
+    text = text.lower()
+    if not text.isascii():
+        text = ''.join(c for c in unicodedata.normalize('NFD', text) if not unicodedata.combining(c))
+    return tuple(_WORD.findall(text))
+
+
+class CredentialIndex:
+    """
+    In-memory index over the whole vault, answering sidebar filters and
+    searches without scanning every row.
+
+    Keeps id sets per category and for favorites, each with its rows' sort
+    keys pre-sorted; a word index over the site name, username, URL and
+    notes (plus one over site names alone, for ranking); and exact-match
+    sets of normalized usernames and domains. Building from a list of rows
+    sorts everything once; add() and remove() then keep it current one row
+    at a time.
+
+    search() matches like DBManager.search on an unlocked vault, so results
+    don't depend on whether the index or the database answered.
+    """
+
+    def __init__(self, rows=(), metadata_searchable: bool = True):
+        """
+        Args:
+            rows: Credentials to index, in any order
+            metadata_searchable: False when usernames, URLs and notes are
+                encrypted, so only site names and exact username/domain
+                lookups match, as in the database
+        """
+        self.metadata_searchable = metadata_searchable
+        self._rows = {}
+        self._sort_keys = {}
+        # Sorted (site_name, id) keys: every row, per category, favorites
+        self._order = []
+        self._category_orders = {}
+        self._favorite_order = []
+        self._categories = {}
+        self._favorites = set()
+        # word -> ids for any column and for site names, the sorted
+        # vocabulary for prefix ranges, and each row's words per column
+        # (site_name, username, url, notes)
+        self._postings = defaultdict(set)
+        self._site_postings = defaultdict(set)
+        self._vocabulary = []
+        self._row_words = {}
+        # Normalized username / domain -> ids, and each row's pair
+        self._usernames = defaultdict(set)
+        self._domains = defaultdict(set)
+        self._lookup_keys = {}
+
+        for row in rows:
+            self._index(row)
+        # Sorted once here rather than insorted row by row
+        self._order = sorted(self._sort_keys.values())
+        for category, ids in self._categories.items():
+            self._category_orders[category] = sorted(map(self._sort_keys.__getitem__, ids))
+        self._favorite_order = sorted(map(self._sort_keys.__getitem__, self._favorites))
+        self._vocabulary = sorted(self._postings)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, cred_id):
+        return cred_id in self._rows
+
+    def get(self, cred_id: int):
+        return self._rows.get(cred_id)
+
+    def add(self, row):
+        """Index a credential, replacing any earlier version of it"""
+        self.remove(row.id)
+        new_words = self._index(row)
+
+        sort_key = self._sort_keys[row.id]
+        insort(self._order, sort_key)
+        insort(self._category_orders.setdefault(row.category, []), sort_key)
+        if row.is_favorite:
+            insort(self._favorite_order, sort_key)
+        for word in new_words:
+            insort(self._vocabulary, word)
+
+    def update(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def remove(self, cred_id: int):
+        """Drop a credential from the index, if present"""
+        row = self._rows.pop(cred_id, None)
+        if row is None:
+            return
+
+        sort_key = self._sort_keys.pop(cred_id)
+        self._discard_key(self._order, sort_key)
+
+        members = self._categories[row.category]
+        members.discard(cred_id)
+        self._discard_key(self._category_orders[row.category], sort_key)
+        if not members:
+            del self._categories[row.category]
+            del self._category_orders[row.category]
+        if cred_id in self._favorites:
+            self._favorites.discard(cred_id)
+            self._discard_key(self._favorite_order, sort_key)
+
+        columns = self._row_words.pop(cred_id)
+        for word in set(columns[0]):
+            self._discard_id(self._site_postings, word, cred_id)
+        for word in set().union(*columns):
+            if self._discard_id(self._postings, word, cred_id):
+                self._discard_key(self._vocabulary, word)
+
+        username, domain = self._lookup_keys.pop(cred_id)
+        self._discard_id(self._usernames, username, cred_id)
+        self._discard_id(self._domains, domain, cred_id)
+
+    def rows(self, category: str = None, favorites_only: bool = False):
+        """Credentials matching a sidebar filter, ordered like get_credentials_page"""
+        return [self._rows[cred_id] for _, cred_id in self._filter_order(category, favorites_only)]
+
+    def search(self, query: str, limit: int = None, category: str = None,
+               favorites_only: bool = False):
+        """
+        Search within a sidebar filter like DBManager.search: each word of
+        query must begin a word in some field (punctuated words such as
+        "git-hub" as a phrase), and a query equal to a row's username or
+        domain finds it too.
+
+        Returns:
+            List of Credential records: exact username/domain matches, then
+            site name matches, then the rest, each in display order
+        """
+        terms = query.split()
+        if not terms:
+            return []
+
+        order = self._filter_order(category, favorites_only)
+        filter_ids = None
+        if category is not None or favorites_only:
+            filter_ids = {cred_id for _, cred_id in order}
+
+        exact = self._exact_ids(query.strip(), filter_ids)
+        phrases = [words(term) for term in terms]
+        if all(phrases):
+            matches = self._phrase_ids(phrases, filter_ids, site_only=not self.metadata_searchable)
+            site_matches = self._phrase_ids(phrases, matches, site_only=True)
+        else:
+            matches = site_matches = set()  # A term with no words matches nothing, as in FTS5
+
+        site_matches -= exact
+        other_matches = matches - exact - site_matches
+        results = []
+        for ids in (exact, site_matches, other_matches):
+            results.extend(self._in_order(ids, order))
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+        return results
+
+    def _index(self, row):
+        """
+        Add row to the lookup tables, leaving the sorted lists to the
+        caller. Returns words new to the vocabulary.
+        """
+        self._rows[row.id] = row
+        self._sort_keys[row.id] = row.sort_key
+        self._categories.setdefault(row.category, set()).add(row.id)
+        if row.is_favorite:
+            self._favorites.add(row.id)
+
+        columns = (words(row.site_name), words(row.username), words(row.url), words(row.notes))
+        self._row_words[row.id] = columns
+        for word in columns[0]:
+            self._site_postings[word].add(row.id)
+        new_words = []
+        for word in set(columns[0] + columns[1] + columns[2] + columns[3]):
+            ids = self._postings[word]
+            if not ids:
+                new_words.append(word)
+            ids.add(row.id)
+
+        keys = (normalize_username(row.username), normalize_domain(row.url, row.site_name))
+        self._lookup_keys[row.id] = keys
+        self._usernames[keys[0]].add(row.id)
+        self._domains[keys[1]].add(row.id)
+        return new_words
+
+    @staticmethod
+    def _discard_key(order, key):
+        del order[bisect_left(order, key)]
+
+    @staticmethod
+    def _discard_id(postings, key, cred_id):
+        """Remove cred_id from postings[key]. Returns whether the key went away."""
+        ids = postings[key]
+        ids.discard(cred_id)
+        if not ids:
+            del postings[key]
+            return True
+        return False
+
+    def _filter_order(self, category, favorites_only):
+        """Sorted (site_name, id) keys of the rows in a sidebar filter"""
+        if category is None:
+            return self._favorite_order if favorites_only else self._order
+        order = self._category_orders.get(category, [])
+        if not favorites_only:
+            return order
+        # Walk the shorter pre-sorted list, checking the other's membership
+        if len(order) <= len(self._favorite_order):
+            return [key for key in order if key[1] in self._favorites]
+        members = self._categories[category]
+        return [key for key in self._favorite_order if key[1] in members]
+
+    def _in_order(self, ids, order):
+        """Rows for ids (a subset of order's), in display order"""
+        if not ids:
+            return []
+        if len(ids) * 8 >= len(order):
+            # Most of the filter: walk its sorted keys instead of sorting
+            return [self._rows[cred_id] for _, cred_id in order if cred_id in ids]
+        return [self._rows[cred_id] for cred_id in sorted(ids, key=self._sort_keys.__getitem__)]
+
+    def _exact_ids(self, value, filter_ids):
+        """Ids whose normalized username or domain equals value's"""
+        ids = set()
+        username = normalize_username(value)
+        if username:
+            ids |= self._usernames.get(username, set())
+        domain = normalize_domain(value)
+        if domain:
+            ids |= self._domains.get(domain, set())
+        return ids if filter_ids is None else ids & filter_ids
+
+    def _phrase_ids(self, phrases, ids, site_only):
+        """
+        Narrow ids (None for every row) to those where every phrase's words
+        appear consecutively in one column, the last word as a prefix
+        """
+        postings = self._site_postings if site_only else self._postings
+        # Longer phrases narrow the candidates most, so start with them
+        for phrase in sorted(phrases, key=len, reverse=True):
+            ids = self._candidates(phrase, ids, postings)
+            if not ids:
+                return set()
+
+        # A one-word phrase is proven by its posting; longer ones need
+        # their words next to each other
+        long_phrases = [phrase for phrase in phrases if len(phrase) > 1]
+        if long_phrases:
+            ids = {
+                cred_id for cred_id in ids
+                if all(any(self._contains(column, phrase)
+                           for column in self._row_words[cred_id][:1 if site_only else None])
+                       for phrase in long_phrases)
+            }
+        return ids
+
+    def _candidates(self, phrase, ids, postings):
+        """
+        Narrow ids (None for every row) to those with every word of phrase
+        in postings, the last one as a prefix
+        """
+        *whole, prefix = phrase
+        sets = [postings.get(word) for word in whole]
+        if not all(sets):
+            return set()
+
+        # Words sharing the prefix sit together in the sorted vocabulary
+        start = end = bisect_left(self._vocabulary, prefix)
+        while end < len(self._vocabulary) and self._vocabulary[end].startswith(prefix):
+            end += 1
+        matching = [postings[word] for word in self._vocabulary[start:end] if word in postings]
+        if not matching:
+            return set()
+        sets.append(matching[0] if len(matching) == 1 else set().union(*matching))
+
+        # Smallest sets first; & iterates the smaller set, so a narrow
+        # filter stays cheap however common the words are
+        for members in sorted(sets, key=len):
+            ids = set(members) if ids is None else ids & members
+            if not ids:
+                break
+        return ids
+
+    @staticmethod
+    def _contains(column, phrase):
+        """Whether phrase's words appear consecutively in column, the last as a prefix"""
+        *whole, prefix = phrase
+        for start in range(len(column) - len(phrase) + 1):
+            if (column[start + len(whole)].startswith(prefix)
+                    and all(column[start + i] == word for i, word in enumerate(whole))):
+                return True
+        return False
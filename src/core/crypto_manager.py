@@ -1,30 +1,151 @@
 import base64
+import json
+import math
 import os
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes, hmac
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+# Known plaintext encrypted into the "verifier" setting; decrypting it back
+# proves the master password is correct
+VERIFIER_TEXT = "VERIFIED"
+
+# Ciphertext formats, identified by the first byte of the decoded token.
+# Envelope layout: version (1) | nonce (12) | ciphertext | tag (16)
+FORMAT_FERNET = 0x80  # Fernet's own version byte; every token before envelopes
+FORMAT_AES_GCM = 0x01
+FORMAT_CHACHA20 = 0x02
+
+# AEAD cipher and HKDF info string for its subkey, per envelope version
+_AEAD_CIPHERS = {
+    FORMAT_AES_GCM: (AESGCM, b"pwkeeper/aes-256-gcm"),
+    FORMAT_CHACHA20: (ChaCha20Poly1305, b"pwkeeper/chacha20-poly1305"),
+}
+_NONCE_SIZE = 12
+
+
+class KdfParams:
+    """
+    Key derivation algorithm and cost parameters, stored as JSON in the
+    "kdf" setting. Vaults created before that setting existed use LEGACY.
+    """
+    __slots__ = ('algorithm', 'iterations', 'n', 'r', 'p')
+
+    PBKDF2 = "pbkdf2-sha256"
+    SCRYPT = "scrypt"
+
+    def __init__(self, algorithm: str, iterations: int = None, n: int = None, r: int = 8, p: int = 1):
+        if algorithm not in (self.PBKDF2, self.SCRYPT):
+            raise ValueError(f"Unknown key derivation algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.iterations = iterations
+        self.n = n
+        self.r = r
+        self.p = p
+
+    @classmethod
+    def pbkdf2(cls, iterations: int) -> "KdfParams":
+        return cls(cls.PBKDF2, iterations=iterations)
+
+    @classmethod
+    def scrypt(cls, n: int, r: int = 8, p: int = 1) -> "KdfParams":
+        return cls(cls.SCRYPT, n=n, r=r, p=p)
+
+    @classmethod
+    def from_json(cls, text) -> "KdfParams":
+        """Parses the "kdf" setting; None means the vault predates it."""
+        if text is None:
+            return cls.LEGACY
+        return cls(**json.loads(text))
+
+    def to_json(self) -> str:
+        if self.algorithm == self.PBKDF2:
+            fields = {"iterations": self.iterations}
+        else:
+            fields = {"n": self.n, "r": self.r, "p": self.p}
+        return json.dumps({"algorithm": self.algorithm, **fields})
+
+    def kdf(self, salt: bytes):
+        """Builds a single-use cryptography KDF producing a 32-byte key."""
+        if self.algorithm == self.PBKDF2:
+            return PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=self.iterations)
+        return Scrypt(salt=salt, length=32, n=self.n, r=self.r, p=self.p)
+
+    def __eq__(self, other):
+        if not isinstance(other, KdfParams):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"KdfParams({self.to_json()})"
+
+
+# Fixed parameters every vault used before they became configurable
+KdfParams.LEGACY = KdfParams.pbkdf2(100_000)
+
 
 class CryptoManager:
+    # Calibration bounds. The floors keep new vaults at least as strong as
+    # LEGACY on slow machines; the scrypt ceiling caps memory at 256 MiB.
+    KDF_TARGET_SECONDS = 0.5
+    PBKDF2_MIN_ITERATIONS = 100_000
+    SCRYPT_MIN_N = 2 ** 14
+    SCRYPT_MAX_N = 2 ** 18
+
     @staticmethod
     def generate_salt(size: int = 16) -> bytes:
         """Generates a random salt."""
         return os.urandom(size)
 
     @staticmethod
-    def derive_key(password: str, salt: bytes) -> bytes:
+    def derive_key(password: str, salt: bytes, params: KdfParams = None) -> bytes:
         """
         Derives a cryptographic key from the given password and salt.
         Returns a URL-safe base64-encoded key suitable for Fernet.
+
+        Args:
+            params: Algorithm and cost, as stored in the "kdf" setting.
+                    Defaults to KdfParams.LEGACY.
         """
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100_000,
-        )
+        kdf = (params or KdfParams.LEGACY).kdf(salt)
         key = kdf.derive(password.encode())
         return base64.urlsafe_b64encode(key)
 
+    @staticmethod
+    def calibrate_kdf(algorithm: str = KdfParams.SCRYPT, target_seconds: float = None) -> KdfParams:
+        """
+        Times a cheap derivation on this machine and scales the cost so one
+        derivation takes about target_seconds (KDF_TARGET_SECONDS by default).
+        Both algorithms' cost grows linearly with iterations / n.
+        """
+        target = target_seconds or CryptoManager.KDF_TARGET_SECONDS
+
+        def fastest_of(params, runs=2):
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                CryptoManager.derive_key("calibration", b"\0" * 16, params)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        if algorithm == KdfParams.PBKDF2:
+            probe = 20_000
+            iterations = int(probe * target / fastest_of(KdfParams.pbkdf2(probe)))
+            return KdfParams.pbkdf2(max(iterations, CryptoManager.PBKDF2_MIN_ITERATIONS))
+
+        probe = KdfParams.scrypt(CryptoManager.SCRYPT_MIN_N)
+        # n must be a power of two; round to the nearest one
+        exponent = round(math.log2(probe.n * target / fastest_of(probe)))
+        n = min(max(2 ** exponent, CryptoManager.SCRYPT_MIN_N), CryptoManager.SCRYPT_MAX_N)
+        return KdfParams.scrypt(n)
+
     @staticmethod
     def encrypt_data(data: str, key: bytes) -> bytes:
         """Encrypts data using the provided Fernet key."""
@@ -36,3 +157,258 @@ class CryptoManager:
         """Decrypts data using the provided Fernet key."""
         f = Fernet(key)
         return f.decrypt(token).decode()
+
+
+class BatchResult:
+    """
+    Outcome of a batch encrypt/decrypt, in input order.
+    results holds None where an item failed; errors maps index -> exception.
+    """
+    __slots__ = ('results', 'errors')
+
+    def __init__(self, results, errors):
+        self.results = results
+        self.errors = errors
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class CryptoSession:
+    """
+    Encryption state for an unlocked vault, created once at login.
+
+    Keeps prepared ciphers so encrypting or decrypting a record doesn't
+    re-decode the key and rebuild the cipher each time.
+
+    New values are sealed in a versioned AEAD envelope (AES-256-GCM by
+    default) whose associated data binds the credential's row id, so a
+    ciphertext copied onto another row fails to decrypt. Decryption
+    dispatches on the version byte, so Fernet tokens keep working.
+    """
+
+    # Items per task handed to the thread pool by the batch APIs
+    BATCH_CHUNK_SIZE = 256
+
+    DEFAULT_FORMAT = FORMAT_AES_GCM
+
+    def __init__(self, key: bytes, cipher_format: int = None):
+        """
+        Args:
+            key: URL-safe base64-encoded key, as returned by CryptoManager.derive_key
+            cipher_format: Format for new ciphertexts: FORMAT_AES_GCM,
+                           FORMAT_CHACHA20 or FORMAT_FERNET
+        """
+        self.cipher_format = cipher_format or self.DEFAULT_FORMAT
+        if self.cipher_format != FORMAT_FERNET and self.cipher_format not in _AEAD_CIPHERS:
+            raise ValueError(f"Unknown cipher format: {self.cipher_format:#x}")
+        self._key = bytearray(key)
+        self._fernet = Fernet(bytes(self._key))
+        self._aeads = {}
+        self._subkeys = {}
+        self._pool = None
+
+    @classmethod
+    def generate(cls, cipher_format: int = None) -> "CryptoSession":
+        """Opens a session for a fresh random key, e.g. a vault data key."""
+        return cls(base64.urlsafe_b64encode(os.urandom(32)), cipher_format)
+
+    @property
+    def is_open(self) -> bool:
+        return self._fernet is not None
+
+    def encrypt(self, data, associated_id: int = None, context: bytes = b"") -> bytes:
+        """
+        Encrypts a str or bytes value and returns the raw ciphertext bytes,
+        ready to store in a BLOB column.
+
+        Args:
+            associated_id: Row id the ciphertext is bound to; the same id
+                           must be passed to decrypt it
+            context: Names the field within the row (e.g. b"notes"); the
+                     password column uses the empty default
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        if self.cipher_format == FORMAT_FERNET:
+            return base64.urlsafe_b64decode(self._cipher().encrypt(data))
+
+        header = bytes([self.cipher_format])
+        nonce = os.urandom(_NONCE_SIZE)
+        sealed = self._aead(self.cipher_format).encrypt(
+            nonce, data, self._associated_data(header, associated_id, context))
+        return header + nonce + sealed
+
+    def encrypt_text(self, data, associated_id: int = None) -> str:
+        """Like encrypt, but returns URL-safe base64 text for TEXT storage such as settings."""
+        return base64.urlsafe_b64encode(self.encrypt(data, associated_id)).decode()
+
+    def decrypt(self, token, associated_id: int = None, context: bytes = b"") -> str:
+        """Decrypts a token to a str. See decrypt_bytes."""
+        return self.decrypt_bytes(token, associated_id, context).decode()
+
+    def decrypt_bytes(self, token, associated_id: int = None, context: bytes = b"") -> bytes:
+        """
+        Decrypts a token to bytes. bytes or memoryview tokens are raw
+        ciphertext; str tokens are URL-safe base64 text, as written by
+        encrypt_text and by versions that stored text.
+
+        Raises InvalidToken if the token is malformed, was tampered with,
+        or belongs to another key or row.
+        """
+        if isinstance(token, str):
+            try:
+                token = base64.urlsafe_b64decode(token)
+            except ValueError:
+                raise InvalidToken
+        raw = memoryview(token)
+        if not raw:
+            raise InvalidToken
+
+        version = raw[0]
+        if version == FORMAT_FERNET:
+            # Fernet has no associated data; these rows predate envelopes
+            return self._cipher().decrypt(base64.urlsafe_b64encode(raw))
+        if version not in _AEAD_CIPHERS:
+            raise InvalidToken
+
+        header, nonce, sealed = raw[:1], raw[1:1 + _NONCE_SIZE], raw[1 + _NONCE_SIZE:]
+        try:
+            return self._aead(version).decrypt(
+                nonce, sealed, self._associated_data(header, associated_id, context))
+        except (InvalidTag, ValueError):
+            # ValueError: truncated envelope (e.g. nonce shorter than 12 bytes)
+            raise InvalidToken
+
+    def encrypt_many(self, values, workers: int = None, associated_ids=None) -> BatchResult:
+        """
+        Encrypts many str/bytes values across a thread pool.
+
+        Args:
+            associated_ids: Row ids matching values, or None for unbound values
+
+        Returns:
+            BatchResult with tokens in input order
+        """
+        pairs = zip(values, associated_ids if associated_ids is not None else repeat(None))
+        return self._run_batch(lambda pair: self.encrypt(*pair), pairs, workers)
+
+    def decrypt_many(self, tokens, workers: int = None, associated_ids=None) -> BatchResult:
+        """
+        Decrypts many tokens across a thread pool. A token that fails to
+        decrypt is reported in BatchResult.errors without stopping the batch.
+
+        Args:
+            associated_ids: Row ids matching tokens, or None for unbound tokens
+
+        Returns:
+            BatchResult with str plaintexts in input order
+        """
+        pairs = zip(tokens, associated_ids if associated_ids is not None else repeat(None))
+        return self._run_batch(lambda pair: self.decrypt(*pair), pairs, workers)
+
+    def _run_batch(self, func, items, workers):
+        items = list(items)
+        size = self.BATCH_CHUNK_SIZE
+        chunks = [(start, items[start:start + size]) for start in range(0, len(items), size)]
+
+        def run_chunk(chunk):
+            start, chunk_items = chunk
+            results, errors = [], {}
+            for offset, item in enumerate(chunk_items):
+                try:
+                    results.append(func(item))
+                except Exception as e:
+                    results.append(None)
+                    errors[start + offset] = e
+            return results, errors
+
+        # Small batches aren't worth the hand-off to the pool. Otherwise the
+        # cryptography backend releases the GIL inside the cipher primitives,
+        # so chunks can run in parallel.
+        if len(chunks) <= 1 or workers == 1:
+            outcomes = list(map(run_chunk, chunks))
+        elif workers is None:
+            outcomes = list(self._shared_pool().map(run_chunk, chunks))
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwkeeper-crypto") as pool:
+                outcomes = list(pool.map(run_chunk, chunks))
+
+        all_results, all_errors = [], {}
+        for results, errors in outcomes:
+            all_results.extend(results)
+            all_errors.update(errors)
+        return BatchResult(all_results, all_errors)
+
+    def _shared_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(thread_name_prefix="pwkeeper-crypto")
+        return self._pool
+
+    def wrap_with(self, session) -> str:
+        """Encrypts this session's key under another session's key, as base64 text."""
+        return session.encrypt_text(bytes(self._key))
+
+    def unwrap(self, token) -> "CryptoSession":
+        """Opens a session for a key that was wrapped with this session."""
+        return CryptoSession(self.decrypt_bytes(token))
+
+    def close(self):
+        """
+        Drops the cipher and overwrites this session's copy of the key.
+        Copies held inside the cryptography backend are released to the
+        garbage collector but can't be wiped from Python.
+        """
+        for i in range(len(self._key)):
+            self._key[i] = 0
+        self._fernet = None
+        self._aeads = {}
+        self._subkeys = {}
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _cipher(self):
+        if self._fernet is None:
+            raise RuntimeError("Crypto session is closed")
+        return self._fernet
+
+    def blind_index(self, purpose: bytes, value: str) -> bytes:
+        """
+        Keyed HMAC-SHA256 of a normalized value, truncated to 16 bytes, for
+        equality lookups without storing or decrypting the value. purpose
+        separates indexes, so equal values in different columns don't match.
+        """
+        key = self._subkeys.get("blind-index")
+        if key is None:
+            key = self._subkeys["blind-index"] = self._derive_subkey(b"pwkeeper/blind-index")
+        mac = hmac.HMAC(key, hashes.SHA256())
+        mac.update(purpose + b"\0" + value.encode())
+        return mac.finalize()[:16]
+
+    def _derive_subkey(self, info):
+        self._cipher()  # Raises if closed
+        return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=info).derive(
+            base64.urlsafe_b64decode(bytes(self._key)))
+
+    def _aead(self, version):
+        """AEAD cipher for an envelope version, keyed with an HKDF subkey"""
+        aead = self._aeads.get(version)
+        if aead is None:
+            cipher_class, info = _AEAD_CIPHERS[version]
+            aead = self._aeads[version] = cipher_class(self._derive_subkey(info))
+        return aead
+
+    @staticmethod
+    def _associated_data(header, associated_id, context=b""):
+        # The header is authenticated too, so the version can't be swapped
+        if associated_id is None:
+            return bytes(header) + context
+        return bytes(header) + associated_id.to_bytes(8, "big") + context
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,64 +1,196 @@
 import sqlite3
+import base64
 import datetime
+import itertools
 import os
+import sys
+import threading
 from contextlib import contextmanager
+from src.core.models import Credential
+from src.core.field_crypto import normalize_username
+
+APP_NAME = "PwKeeper"
+
+# Overrides the directory that holds the database
+DATA_DIR_ENV = "PWKEEPER_DATA_DIR"
+
+# Pass as db_filename for a RAM-backed database that is never written to disk
+MEMORY_DB = ":memory:"
+
+_memory_db_ids = itertools.count(1)
+
+
+def default_data_dir():
+    """
+    Per-user data directory for the current platform:
+    macOS ~/Library/Application Support/PwKeeper, Windows %APPDATA%\\PwKeeper,
+    elsewhere $XDG_DATA_HOME/PwKeeper (default ~/.local/share/PwKeeper).
+    """
+    home = os.path.expanduser("~")
+    if sys.platform == "darwin":
+        return os.path.join(home, "Library", "Application Support", APP_NAME)
+    if sys.platform == "win32":
+        return os.path.join(os.environ.get("APPDATA") or home, APP_NAME)
+    xdg_data_home = os.environ.get("XDG_DATA_HOME") or os.path.join(home, ".local", "share")
+    return os.path.join(xdg_data_home, APP_NAME)
+
 
 class DBManager:
-    def __init__(self, db_filename: str = "password_keeper.db"):
-        # Determine user data directory
-        home = os.path.expanduser("~")
-        app_data_dir = os.path.join(home, "Library", "Application Support", "PwKeeper")
-        
-        # Create directory if it doesn't exist
-        os.makedirs(app_data_dir, exist_ok=True)
-        
-        self.db_path = os.path.join(app_data_dir, db_filename)
+    # Applied once to the long-lived connection. WAL lets readers run while a
+    # write is in progress, and synchronous=NORMAL only fsyncs at checkpoints.
+    CONNECTION_PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA cache_size=-8000",      # ~8 MB page cache
+        "PRAGMA mmap_size=67108864",    # 64 MB memory-mapped reads
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA busy_timeout=5000",
+    )
+
+    def __init__(self, db_filename: str = "password_keeper.db", data_dir: str = None):
+        """
+        Args:
+            db_filename: File name inside the data directory, an absolute
+                         path, or MEMORY_DB for an in-memory database
+            data_dir: Directory for the database. Defaults to
+                      $PWKEEPER_DATA_DIR, then default_data_dir()
+        """
+        self.in_memory = db_filename == MEMORY_DB
+        self._keepalive = None
+
+        if self.in_memory:
+            # A named shared-cache database, so the connection can be reopened
+            # (e.g. on the worker thread) without losing the data
+            self.db_path = f"file:pwkeeper-{os.getpid()}-{next(_memory_db_ids)}?mode=memory&cache=shared"
+            self._keepalive = sqlite3.connect(self.db_path, uri=True, check_same_thread=False)
+        elif os.path.isabs(db_filename):
+            self.db_path = db_filename
+        else:
+            app_data_dir = data_dir or os.environ.get(DATA_DIR_ENV) or self._resolve_default_dir(db_filename)
+
+            # Create directory if it doesn't exist
+            os.makedirs(app_data_dir, exist_ok=True)
+
+            self.db_path = os.path.join(app_data_dir, db_filename)
+
+        # One connection is shared by every call; the lock makes it safe to
+        # use from worker threads as well as the GUI thread.
+        self._lock = threading.RLock()
+        self._conn = None
+        self._fts_enabled = None
+
+        # FieldCrypto for the unlocked vault; set after login. Without it
+        # metadata is written as plaintext with no blind indexes.
+        self.field_crypto = None
+
+        # Write-through cache of the settings table, see _cached_settings()
+        self._settings = None
+        self._data_version = None
         self._init_db()
 
     def _init_db(self):
-        """Initializes the database tables."""
+        """
+        Brings the schema up to date. Each pending migration runs once, in its
+        own transaction, and bumps PRAGMA user_version; when the schema is
+        current this is a single integer read.
+        """
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            # Table for Credentials
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS credentials (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    category TEXT,
-                    site_name TEXT,
-                    username TEXT,
-                    encrypted_password TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            # Table for App Settings (e.g., Master Salt, Verification Hash)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT
-                )
-            """)
-            conn.commit()
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+        for target, migration in enumerate(self.MIGRATIONS[version:], version + 1):
+            with self.transaction() as cursor:
+                migration(self, cursor)
+                cursor.execute(f"PRAGMA user_version = {target}")
 
-            # Run migration to add new columns if needed
-            self._migrate_database()
+    @staticmethod
+    def _resolve_default_dir(db_filename):
+        """
+        default_data_dir(), except when an existing database is still in the
+        macOS-style location that earlier versions used on every platform.
+        """
+        data_dir = default_data_dir()
+        legacy_dir = os.path.join(os.path.expanduser("~"), "Library", "Application Support", APP_NAME)
+        if (legacy_dir != data_dir and os.path.exists(os.path.join(legacy_dir, db_filename))
+                and not os.path.exists(os.path.join(data_dir, db_filename))):
+            return legacy_dir
+        return data_dir
+
+    def _connect(self):
+        """Opens the shared connection and applies the tuning pragmas."""
+        # isolation_level=None: transactions are opened explicitly by
+        # transaction() instead of implicitly before every DML statement.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                               uri=self.in_memory)
+        # WAL and mmap don't apply to memory databases; SQLite ignores them
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
 
     @contextmanager
     def get_connection(self):
-        """Context manager for SQLite connection."""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            yield conn
-        finally:
-            conn.close()
+        """Context manager yielding the shared SQLite connection."""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            yield self._conn
 
-    def add_credential(self, category: str, site_name: str, username: str, encrypted_password: str):
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the block in a single write transaction and yields a cursor.
+        Commits on success, rolls back on error. Nested calls join the
+        outer transaction.
+        """
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            if conn.in_transaction:
+                yield conn.cursor()
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn.cursor()
+            except BaseException:
+                conn.rollback()
+                # Cached settings may include writes that were just undone
+                self._settings = None
+                raise
+            conn.commit()
+
+    def close(self):
+        """
+        Closes the shared connection. It is reopened on next use; an in-memory
+        database keeps its data until the DBManager itself is discarded.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            # data_version is per connection, so the cache can't be validated
+            self._settings = None
+
+    def _credential_cursor(self, conn):
+        """Cursor whose rows come back as Credential records"""
+        cursor = conn.cursor()
+        cursor.row_factory = self._credential_row_factory
+        return cursor
+
+    @property
+    def _credential_row_factory(self):
+        """Credential.from_row, decrypting metadata once the vault is unlocked"""
+        return self.field_crypto.open_row if self.field_crypto else Credential.from_row
+
+    def _seal_fields(self, cred_id, site_name, username, url, notes):
+        """(username, url, notes, username_index, domain_index) to store for a row"""
+        if self.field_crypto is None:
+            return (username, url, notes, None, None)
+        return self.field_crypto.seal(cred_id, site_name, username, url, notes)
+
+    def add_credential(self, category: str, site_name: str, username: str, encrypted_password: bytes):
+        with self.transaction() as cursor:
             cursor.execute("""
                 INSERT INTO credentials (category, site_name, username, encrypted_password, created_at)
                 VALUES (?, ?, ?, ?, ?)
             """, (category, site_name, username, encrypted_password, datetime.datetime.now()))
-            conn.commit()
             return cursor.lastrowid
 
     def get_all_credentials(self):
@@ -74,34 +206,53 @@ class DBManager:
             return cursor.fetchone()
 
     def delete_credential(self, cred_id: int):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        with self.transaction() as cursor:
             cursor.execute("DELETE FROM credentials WHERE id = ?", (cred_id,))
-            conn.commit()
 
-    def update_credential(self, cred_id: int, category: str, site_name: str, username: str, encrypted_password: str):
-         with self.get_connection() as conn:
-            cursor = conn.cursor()
+    def update_credential(self, cred_id: int, category: str, site_name: str, username: str, encrypted_password: bytes):
+        with self.transaction() as cursor:
             cursor.execute("""
                 UPDATE credentials 
                 SET category = ?, site_name = ?, username = ?, encrypted_password = ?
                 WHERE id = ?
             """, (category, site_name, username, encrypted_password, cred_id))
-            conn.commit()
 
     # Settings Helpers
+    def _cached_settings(self, conn):
+        """
+        Returns the settings table as a dict, loaded in one query and reused
+        until another connection (e.g. a second app instance) commits to the
+        database, which changes PRAGMA data_version.
+        """
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._settings is None or data_version != self._data_version:
+            self._settings = dict(conn.execute("SELECT key, value FROM settings").fetchall())
+            self._data_version = data_version
+        return self._settings
+
     def get_setting(self, key: str):
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
-            row = cursor.fetchone()
-            return row[0] if row else None
+            return self._cached_settings(conn).get(key)
 
     def set_setting(self, key: str, value: str):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
-            conn.commit()
+        self.set_settings({key: value})
+
+    def set_settings(self, values: dict):
+        """Write several settings in one transaction"""
+        with self.transaction() as cursor:
+            cursor.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", values.items())
+            # Our own commits don't change data_version, so update the cache here
+            if self._settings is not None:
+                self._settings.update(values)
+
+    def delete_settings(self, keys):
+        """Remove several settings in one transaction"""
+        keys = list(keys)
+        with self.transaction() as cursor:
+            cursor.executemany("DELETE FROM settings WHERE key = ?", ((key,) for key in keys))
+            if self._settings is not None:
+                for key in keys:
+                    self._settings.pop(key, None)
 
     # Preferences (alias for settings with default support)
     def get_preference(self, key: str, default=None):
@@ -113,43 +264,448 @@ class DBManager:
         """Set a user preference"""
         self.set_setting(key, value)
 
-    # Migration
-    def _migrate_database(self):
-        """Migrate database schema to add new columns if they don't exist"""
+    # Migrations (append only; a migration's index + 1 is its schema version)
+    def _migrate_base_tables(self, cursor):
+        """v1: credentials and settings tables"""
+        # Table for Credentials
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS credentials (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category TEXT,
+                site_name TEXT,
+                username TEXT,
+                encrypted_password TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Table for App Settings (e.g., Master Salt, Verification Hash)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+    def _migrate_extended_columns(self, cursor):
+        """v2: favorite, url, notes and updated_at columns"""
+        # Databases created before versioning may already have some of them
+        cursor.execute("PRAGMA table_info(credentials)")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+
+        columns = [
+            ("is_favorite", "INTEGER DEFAULT 0"),
+            ("url", "TEXT DEFAULT ''"),
+            ("notes", "TEXT DEFAULT ''"),
+            ("updated_at", "TIMESTAMP"),  # Can't use CURRENT_TIMESTAMP in ALTER TABLE
+        ]
+        for column_name, column_def in columns:
+            if column_name not in existing_columns:
+                cursor.execute(f"ALTER TABLE credentials ADD COLUMN {column_name} {column_def}")
+
+        # Set current timestamp for existing rows
+        cursor.execute("UPDATE credentials SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+
+    def _migrate_search_index(self, cursor):
+        """
+        v3: FTS5 index over credential metadata and the triggers that keep it
+        in sync. Skipped if this SQLite build lacks FTS5.
+        """
+        # Rebuilt from scratch in case an unversioned database already has it
+        cursor.execute("DROP TABLE IF EXISTS credentials_fts")
+        for trigger in ("credentials_fts_insert", "credentials_fts_delete", "credentials_fts_update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE credentials_fts USING fts5(
+                    site_name, username, url, notes,
+                    content='credentials', content_rowid='id', prefix='2 3'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable: {e}")
+            return
+
+        cursor.execute("""
+            CREATE TRIGGER credentials_fts_insert AFTER INSERT ON credentials BEGIN
+                INSERT INTO credentials_fts (rowid, site_name, username, url, notes)
+                VALUES (new.id, new.site_name, new.username, new.url, new.notes);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER credentials_fts_delete AFTER DELETE ON credentials BEGIN
+                INSERT INTO credentials_fts (credentials_fts, rowid, site_name, username, url, notes)
+                VALUES ('delete', old.id, old.site_name, old.username, old.url, old.notes);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER credentials_fts_update
+            AFTER UPDATE OF site_name, username, url, notes ON credentials BEGIN
+                INSERT INTO credentials_fts (credentials_fts, rowid, site_name, username, url, notes)
+                VALUES ('delete', old.id, old.site_name, old.username, old.url, old.notes);
+                INSERT INTO credentials_fts (rowid, site_name, username, url, notes)
+                VALUES (new.id, new.site_name, new.username, new.url, new.notes);
+            END
+        """)
+        # Index rows that existed before the table was created
+        cursor.execute("INSERT INTO credentials_fts (credentials_fts) VALUES ('rebuild')")
+
+    def _migrate_page_indexes(self, cursor):
+        """v4: indexes backing keyset pagination (ORDER BY site_name, id)"""
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_credentials_site ON credentials (site_name, id)")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_credentials_category
+            ON credentials (category, site_name, id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_credentials_favorite
+            ON credentials (site_name, id) WHERE is_favorite = 1
+        """)
+
+    def _migrate_changelog(self, cursor):
+        """
+        v5: changelog recording every credential write under a monotonically
+        increasing revision (deletes are tombstones)
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS changelog (
+                revision INTEGER PRIMARY KEY AUTOINCREMENT,
+                cred_id INTEGER NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS changelog_insert AFTER INSERT ON credentials BEGIN
+                INSERT INTO changelog (cred_id) VALUES (new.id);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS changelog_update AFTER UPDATE ON credentials BEGIN
+                INSERT INTO changelog (cred_id) VALUES (new.id);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS changelog_delete AFTER DELETE ON credentials BEGIN
+                INSERT INTO changelog (cred_id, deleted) VALUES (old.id, 1);
+            END
+        """)
+
+    # Rows converted per step by data migrations, bounding memory use
+    MIGRATION_BATCH_SIZE = 1000
+
+    def _migrate_blob_passwords(self, cursor):
+        """
+        v6: encrypted_password holds raw ciphertext bytes instead of base64
+        text. SQLite keeps BLOB values as-is in the TEXT-declared column, so
+        rows are decoded in place, in batches, without rebuilding the table.
+        Values that aren't canonical base64 are left untouched.
+        """
+        last_id = 0
+        while True:
+            cursor.execute("""
+                SELECT id, encrypted_password FROM credentials
+                WHERE id > ? AND typeof(encrypted_password) = 'text'
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, self.MIGRATION_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            updates = []
+            for cred_id, text in rows:
+                try:
+                    raw = base64.urlsafe_b64decode(text)
+                except ValueError:
+                    continue
+                if base64.urlsafe_b64encode(raw).decode() == text:
+                    updates.append((raw, cred_id))
+            cursor.executemany("UPDATE credentials SET encrypted_password = ? WHERE id = ?", updates)
+
+    def _migrate_blind_index(self, cursor):
+        """
+        v7: keyed blind-index columns for exact username/domain lookups on
+        encrypted metadata (see FieldCrypto). They stay NULL until the vault
+        is unlocked and reseal_credentials() fills them. The full-text
+        triggers index encrypted (BLOB) values as empty strings.
+        """
+        cursor.execute("PRAGMA table_info(credentials)")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+        for column_name in ("username_index", "domain_index"):
+            if column_name not in existing_columns:
+                cursor.execute(f"ALTER TABLE credentials ADD COLUMN {column_name} BLOB")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_credentials_username_index
+            ON credentials (username_index)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_credentials_domain_index
+            ON credentials (domain_index)
+        """)
+
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'credentials_fts'")
+        if cursor.fetchone() is None:
+            return
+
+        def text(row, column):
+            return f"CASE WHEN typeof({row}.{column}) = 'text' THEN {row}.{column} ELSE '' END"
+
+        def values(row):
+            return (f"{row}.id, {row}.site_name, {text(row, 'username')}, "
+                    f"{text(row, 'url')}, {text(row, 'notes')}")
+
+        for trigger in ("credentials_fts_insert", "credentials_fts_delete", "credentials_fts_update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute(f"""
+            CREATE TRIGGER credentials_fts_insert AFTER INSERT ON credentials BEGIN
+                INSERT INTO credentials_fts (rowid, site_name, username, url, notes)
+                VALUES ({values('new')});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER credentials_fts_delete AFTER DELETE ON credentials BEGIN
+                INSERT INTO credentials_fts (credentials_fts, rowid, site_name, username, url, notes)
+                VALUES ('delete', {values('old')});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER credentials_fts_update
+            AFTER UPDATE OF site_name, username, url, notes ON credentials BEGIN
+                INSERT INTO credentials_fts (credentials_fts, rowid, site_name, username, url, notes)
+                VALUES ('delete', {values('old')});
+                INSERT INTO credentials_fts (rowid, site_name, username, url, notes)
+                VALUES ({values('new')});
+            END
+        """)
+
+    MIGRATIONS = (
+        _migrate_base_tables,
+        _migrate_extended_columns,
+        _migrate_search_index,
+        _migrate_page_indexes,
+        _migrate_changelog,
+        _migrate_blob_passwords,
+        _migrate_blind_index,
+    )
+
+    # Full-text search
+    @property
+    def fts_enabled(self):
+        """Whether the FTS5 index exists (it is skipped on builds without FTS5)"""
+        if self._fts_enabled is None:
+            with self.get_connection() as conn:
+                row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'credentials_fts'").fetchone()
+            self._fts_enabled = row is not None
+        return self._fts_enabled
+
+    def search(self, query: str, limit: int = None, category: str = None,
+               favorites_only: bool = False):
+        """
+        Search credentials by site name, username, URL and notes.
+
+        Every word in the query is matched as a prefix, and results are
+        ranked by bm25 with site name and username weighted highest.
+
+        Args:
+            query: Free-text search string
+            limit: Maximum number of rows to return (None for all)
+            category: Only return credentials in this category
+            favorites_only: Only return favorited credentials
+
+        Returns:
+            List of Credential records, best match first
+        """
+        terms = query.split()
+        if not terms:
+            return []
+
+        filters = self._search_filters(category, favorites_only)
+        with self.get_connection() as conn:
+            cursor = self._credential_cursor(conn)
+            if self.field_crypto is not None:
+                # Encrypted usernames and URLs aren't in the text index, but
+                # an exact username or domain still finds them
+                exact = self._find_exact(cursor, query.strip(), limit, filters)
+                if exact:
+                    rows = self._search_text(cursor, terms, limit, filters)
+                    exact_ids = {row.id for row in exact}
+                    rows = exact + [row for row in rows if row.id not in exact_ids]
+                    return rows if limit is None else rows[:limit]
+            return self._search_text(cursor, terms, limit, filters)
+
+    @staticmethod
+    def _search_filters(category, favorites_only):
+        """(conditions, params) restricting a search like get_credentials_page"""
+        conditions = []
+        params = []
+        if category is not None:
+            conditions.append("c.category = ?")
+            params.append(category)
+        if favorites_only:
+            conditions.append("c.is_favorite = 1")
+        return conditions, params
+
+    def _search_text(self, cursor, terms, limit, filters=([], [])):
+        """Plaintext search over the FTS5 index, or LIKE without one"""
+        if not self.fts_enabled:
+            return self._search_like(cursor, terms, limit, filters)
+
+        # Quote each term so punctuation is literal, then prefix-match it
+        match = " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+        conditions, params = filters
+        cursor.execute(f"""
+            SELECT c.id, c.category, c.site_name, c.username, c.encrypted_password,
+                   c.is_favorite, c.url, c.notes
+            FROM credentials_fts
+            JOIN credentials c ON c.id = credentials_fts.rowid
+            WHERE {' AND '.join(['credentials_fts MATCH ?'] + conditions)}
+            ORDER BY bm25(credentials_fts, 10.0, 8.0, 4.0, 1.0)
+            LIMIT ?
+        """, (match, *params, -1 if limit is None else limit))
+        return cursor.fetchall()
+
+    def _search_like(self, cursor, terms, limit, filters=([], [])):
+        """Substring search used when FTS5 is not available"""
+        conditions, filter_params = filters
+        clause = " AND ".join(
+            ["(c.site_name LIKE ? OR c.username LIKE ? OR c.url LIKE ? OR c.notes LIKE ?)" for _ in terms]
+            + conditions
+        )
+        params = [f"%{term}%" for term in terms for _ in range(4)]
+        cursor.execute(f"""
+            SELECT id, category, site_name, username, encrypted_password, is_favorite, url, notes
+            FROM credentials c
+            WHERE {clause}
+            ORDER BY site_name
+            LIMIT ?
+        """, (*params, *filter_params, -1 if limit is None else limit))
+        return cursor.fetchall()
+
+    def _find_exact(self, cursor, value, limit, filters=([], [])):
+        """Credentials whose username or domain equals value, via the blind indexes"""
+        matches = []
+        index_params = []
+        if normalize_username(value):
+            matches.append("username_index = ?")
+            index_params.append(self.field_crypto.username_index(value))
+        domain_index = self.field_crypto.domain_index(value)
+        if domain_index is not None:
+            matches.append("domain_index = ?")
+            index_params.append(domain_index)
+        if not matches:
+            return []  # e.g. "http://": nothing to look up
+
+        conditions, params = filters
+        cursor.execute(f"""
+            SELECT id, category, site_name, username, encrypted_password, is_favorite, url, notes
+            FROM credentials c
+            WHERE {' AND '.join(['(' + ' OR '.join(matches) + ')'] + conditions)}
+            ORDER BY site_name, id
+            LIMIT ?
+        """, (*index_params, *params, -1 if limit is None else limit))
+        return cursor.fetchall()
+
+    # Exact-match lookups
+    def find_by_username(self, username: str):
+        """
+        Credentials with this username (trimmed, case-insensitive). Uses the
+        blind index once a vault is unlocked, so it works on encrypted
+        usernames and stays an index seek.
+        """
+        with self.get_connection() as conn:
+            cursor = self._credential_cursor(conn)
+            if self.field_crypto is None:
+                cursor.execute("""
+                    SELECT id, category, site_name, username, encrypted_password, is_favorite, url, notes
+                    FROM credentials
+                    WHERE lower(trim(username)) = ?
+                    ORDER BY site_name, id
+                """, (username.strip().lower(),))
+            else:
+                cursor.execute("""
+                    SELECT id, category, site_name, username, encrypted_password, is_favorite, url, notes
+                    FROM credentials
+                    WHERE username_index = ?
+                    ORDER BY site_name, id
+                """, (self.field_crypto.username_index(username),))
+            return cursor.fetchall()
+
+    def find_by_domain(self, domain: str):
+        """
+        Credentials for a domain or URL (e.g. "github.com" also matches
+        "https://www.github.com/login"). Requires the unlocked vault's
+        field_crypto; returns an empty list without it.
+        """
+        if self.field_crypto is None:
+            return []
+        domain_index = self.field_crypto.domain_index(domain)
+        if domain_index is None:
+            return []
+        with self.get_connection() as conn:
+            cursor = self._credential_cursor(conn)
+            cursor.execute("""
+                SELECT id, category, site_name, username, encrypted_password, is_favorite, url, notes
+                FROM credentials
+                WHERE domain_index = ?
+                ORDER BY site_name, id
+            """, (domain_index,))
+            return cursor.fetchall()
+
+    # Change tracking
+    def compact_changelog(self):
+        """Drop changelog entries superseded by a newer one for the same credential"""
+        with self.transaction() as cursor:
+            cursor.execute("""
+                DELETE FROM changelog
+                WHERE revision NOT IN (SELECT MAX(revision) FROM changelog GROUP BY cred_id)
+            """)
+
+    def get_current_revision(self):
+        """Get the revision of the most recent credential change"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(revision), 0) FROM changelog")
+            return cursor.fetchone()[0]
+
+    def get_changes_since(self, revision: int):
+        """
+        Get credential changes made after the given revision.
+
+        Returns:
+            Tuple of (current_revision, changed_rows, deleted_ids).
+            changed_rows are Credential records for rows that were
+            inserted or updated; deleted_ids lists removed credential ids.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(revision), 0) FROM changelog")
+            current = cursor.fetchone()[0]
+            if current <= revision:
+                return current, [], []
 
-            # Get existing columns
-            cursor.execute("PRAGMA table_info(credentials)")
-            existing_columns = {row[1] for row in cursor.fetchall()}
-
-            # Add missing columns
-            migrations = [
-                ("is_favorite", "INTEGER DEFAULT 0"),
-                ("url", "TEXT DEFAULT ''"),
-                ("notes", "TEXT DEFAULT ''"),
-                ("updated_at", "TIMESTAMP"),  # Can't use CURRENT_TIMESTAMP in ALTER TABLE
-            ]
-
-            for column_name, column_def in migrations:
-                if column_name not in existing_columns:
-                    try:
-                        cursor.execute(f"ALTER TABLE credentials ADD COLUMN {column_name} {column_def}")
-                        conn.commit()
-
-                        # For updated_at, set current timestamp for existing rows
-                        if column_name == "updated_at":
-                            cursor.execute("UPDATE credentials SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
-                            conn.commit()
-                    except sqlite3.Error as e:
-                        # Column might already exist or other error
-                        print(f"Migration warning for {column_name}: {e}")
+            cursor.row_factory = self._credential_row_factory
+            cursor.execute("""
+                SELECT id, category, site_name, username, encrypted_password, is_favorite, url, notes
+                FROM credentials
+                WHERE id IN (SELECT cred_id FROM changelog WHERE revision > ? AND revision <= ?)
+                ORDER BY site_name, id
+            """, (revision, current))
+            changed = cursor.fetchall()
+            cursor.row_factory = None
+
+            cursor.execute("""
+                SELECT DISTINCT cred_id FROM changelog
+                WHERE revision > ? AND revision <= ? AND deleted = 1
+            """, (revision, current))
+            deleted = [row[0] for row in cursor.fetchall()]
+
+        return current, changed, deleted
 
     # Favorites
     def toggle_favorite(self, cred_id: int):
         """Toggle favorite status of a credential"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        with self.transaction() as cursor:
             # Get current status
             cursor.execute("SELECT is_favorite FROM credentials WHERE id = ?", (cred_id,))
             row = cursor.fetchone()
@@ -161,13 +717,12 @@ class DBManager:
 
             # Update
             cursor.execute("UPDATE credentials SET is_favorite = ? WHERE id = ?", (new_status, cred_id))
-            conn.commit()
             return new_status == 1
 
     def get_favorites(self):
         """Get all favorited credentials"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._credential_cursor(conn)
             cursor.execute("""
                 SELECT id, category, site_name, username, encrypted_password, is_favorite, url, notes
                 FROM credentials
@@ -178,39 +733,63 @@ class DBManager:
 
     # Enhanced credential methods
     def add_credential_extended(self, category: str, site_name: str, username: str,
-                                encrypted_password: str, url: str = '', notes: str = '',
+                                encrypted_password, url: str = '', notes: str = '',
                                 is_favorite: int = 0):
-        """Add credential with extended fields"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        """
+        Add credential with extended fields.
+
+        Args:
+            encrypted_password: Ciphertext, or a callable(cred_id) returning it
+                                so it can be bound to the new row's id
+        """
+        with self.transaction() as cursor:
             now = datetime.datetime.now()
+            cred_id = self._next_credential_id(cursor)
+            if callable(encrypted_password):
+                encrypted_password = encrypted_password(cred_id)
+            username, url, notes, username_index, domain_index = self._seal_fields(
+                cred_id, site_name, username, url, notes)
             cursor.execute("""
                 INSERT INTO credentials
-                (category, site_name, username, encrypted_password, url, notes, is_favorite, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (category, site_name, username, encrypted_password, url, notes, is_favorite, now, now))
-            conn.commit()
-            return cursor.lastrowid
+                (id, category, site_name, username, encrypted_password, url, notes, is_favorite,
+                 created_at, updated_at, username_index, domain_index)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (cred_id, category, site_name, username, encrypted_password, url, notes, is_favorite,
+                  now, now, username_index, domain_index))
+            return cred_id
+
+    def _next_credential_id(self, cursor):
+        """
+        Id AUTOINCREMENT would assign to the next credential. Only stable
+        inside a write transaction.
+        """
+        cursor.execute("""
+            SELECT MAX(
+                COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'credentials'), 0),
+                COALESCE((SELECT MAX(id) FROM credentials), 0)
+            ) + 1
+        """)
+        return cursor.fetchone()[0]
 
     def update_credential_extended(self, cred_id: int, category: str, site_name: str,
-                                   username: str, encrypted_password: str, url: str = '',
+                                   username: str, encrypted_password: bytes, url: str = '',
                                    notes: str = ''):
         """Update credential with extended fields"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        username, url, notes, username_index, domain_index = self._seal_fields(
+            cred_id, site_name, username, url, notes)
+        with self.transaction() as cursor:
             cursor.execute("""
                 UPDATE credentials
                 SET category = ?, site_name = ?, username = ?, encrypted_password = ?,
-                    url = ?, notes = ?, updated_at = ?
+                    url = ?, notes = ?, updated_at = ?, username_index = ?, domain_index = ?
                 WHERE id = ?
             """, (category, site_name, username, encrypted_password, url, notes,
-                  datetime.datetime.now(), cred_id))
-            conn.commit()
+                  datetime.datetime.now(), username_index, domain_index, cred_id))
 
     def get_all_credentials_extended(self):
         """Get all credentials with extended fields"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._credential_cursor(conn)
             cursor.execute("""
                 SELECT id, category, site_name, username, encrypted_password, is_favorite, url, notes
                 FROM credentials
@@ -218,13 +797,245 @@ class DBManager:
             """)
             return cursor.fetchall()
 
+    def get_credentials_page(self, after=None, limit: int = 100, category: str = None,
+                             favorites_only: bool = False):
+        """
+        Fetch one page of credentials ordered by (site_name, id).
+
+        Args:
+            after: Cursor returned by the previous call, or None for the first page
+            limit: Page size
+            category: Only return credentials in this category
+            favorites_only: Only return favorited credentials
+
+        Returns:
+            Tuple of (Credential records, next_cursor). next_cursor is None
+            on the last page.
+        """
+        conditions = []
+        params = []
+        if category is not None:
+            conditions.append("category = ?")
+            params.append(category)
+        if favorites_only:
+            conditions.append("is_favorite = 1")
+        if after is not None:
+            conditions.append("(site_name, id) > (?, ?)")
+            params.extend(after)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.get_connection() as conn:
+            cursor = self._credential_cursor(conn)
+            cursor.execute(f"""
+                SELECT id, category, site_name, username, encrypted_password, is_favorite, url, notes
+                FROM credentials
+                {where}
+                ORDER BY site_name, id
+                LIMIT ?
+            """, (*params, limit))
+            rows = cursor.fetchall()
+
+        next_cursor = rows[-1].sort_key if len(rows) == limit else None
+        return rows, next_cursor
+
     def get_credential_by_id_extended(self, cred_id: int):
         """Get a single credential with extended fields"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._credential_cursor(conn)
             cursor.execute("""
                 SELECT id, category, site_name, username, encrypted_password, is_favorite, url, notes
                 FROM credentials
                 WHERE id = ?
             """, (cred_id,))
             return cursor.fetchone()
+
+    # Bulk operations (one transaction per call)
+    def add_credentials_bulk(self, records):
+        """
+        Insert many credentials in a single transaction.
+
+        Args:
+            records: Iterable of (category, site_name, username, encrypted_password,
+                     url, notes, is_favorite) tuples. url, notes and is_favorite
+                     may be omitted. encrypted_password may be a callable(cred_id),
+                     as in add_credential_extended.
+
+        Returns:
+            List of new credential ids, in input order
+        """
+        now = datetime.datetime.now()
+        ids = []
+
+        def rows(first_id):
+            for cred_id, record in enumerate(records, first_id):
+                category, site_name, username, encrypted_password, *extra = record
+                url = extra[0] if len(extra) > 0 else ''
+                notes = extra[1] if len(extra) > 1 else ''
+                is_favorite = extra[2] if len(extra) > 2 else 0
+                if callable(encrypted_password):
+                    encrypted_password = encrypted_password(cred_id)
+                username, url, notes, username_index, domain_index = self._seal_fields(
+                    cred_id, site_name, username, url, notes)
+                ids.append(cred_id)
+                yield (cred_id, category, site_name, username, encrypted_password,
+                       url, notes, is_favorite, now, now, username_index, domain_index)
+
+        with self.transaction() as cursor:
+            # The write lock is held for the whole transaction, so the batch
+            # can take consecutive ids starting at the next free one.
+            cursor.executemany("""
+                INSERT INTO credentials
+                (id, category, site_name, username, encrypted_password, url, notes, is_favorite,
+                 created_at, updated_at, username_index, domain_index)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows(self._next_credential_id(cursor)))
+        return ids
+
+    def update_credentials_bulk(self, records):
+        """
+        Update many credentials in a single transaction.
+
+        Args:
+            records: Iterable of (cred_id, category, site_name, username,
+                     encrypted_password, url, notes) tuples
+        """
+        now = datetime.datetime.now()
+
+        def rows():
+            for cred_id, category, site_name, username, encrypted_password, url, notes in records:
+                username, url, notes, username_index, domain_index = self._seal_fields(
+                    cred_id, site_name, username, url, notes)
+                yield (category, site_name, username, encrypted_password, url, notes, now,
+                       username_index, domain_index, cred_id)
+
+        with self.transaction() as cursor:
+            cursor.executemany("""
+                UPDATE credentials
+                SET category = ?, site_name = ?, username = ?, encrypted_password = ?,
+                    url = ?, notes = ?, updated_at = ?, username_index = ?, domain_index = ?
+                WHERE id = ?
+            """, rows())
+
+    def delete_credentials_bulk(self, cred_ids):
+        """Delete many credentials in a single transaction"""
+        with self.transaction() as cursor:
+            cursor.executemany("DELETE FROM credentials WHERE id = ?",
+                               ((cred_id,) for cred_id in cred_ids))
+
+    # Re-encryption helpers
+    def count_credentials(self, max_id: int = None):
+        """Count credentials, optionally only those with id <= max_id"""
+        with self.get_connection() as conn:
+            if max_id is None:
+                return conn.execute("SELECT COUNT(*) FROM credentials").fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM credentials WHERE id <= ?", (max_id,)).fetchone()[0]
+
+    def get_password_batch(self, after_id: int = 0, limit: int = 500):
+        """
+        Get (id, encrypted_password) pairs ordered by id, for walking the
+        whole table in batches.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, encrypted_password FROM credentials
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+            """, (after_id, limit))
+            return cursor.fetchall()
+
+    def update_passwords_bulk(self, pairs):
+        """
+        Replace encrypted passwords in a single transaction.
+
+        Args:
+            pairs: Iterable of (cred_id, encrypted_password)
+        """
+        with self.transaction() as cursor:
+            cursor.executemany("UPDATE credentials SET encrypted_password = ? WHERE id = ?",
+                               ((token, cred_id) for cred_id, token in pairs))
+
+    # Metadata encryption
+    def reseal_credentials(self, batch_size: int = None):
+        """
+        Rewrite rows whose blind indexes are missing (new since the last
+        unlock, or all rows after set_metadata_encryption) so their metadata
+        matches field_crypto's setting. Runs in batched transactions, so an
+        interrupted pass resumes where it left off. Once metadata is
+        encrypted, the plaintext left behind on disk is purged.
+
+        Returns:
+            Number of rows rewritten
+        """
+        field_crypto = self.field_crypto
+        if field_crypto is None:
+            raise RuntimeError("Vault is locked")
+        batch_size = batch_size or self.MIGRATION_BATCH_SIZE
+        with self.transaction() as cursor:
+            # Earlier versions gave every row without a domain the same index
+            cursor.execute("UPDATE credentials SET domain_index = NULL WHERE domain_index = ?",
+                           (field_crypto.empty_domain_index(),))
+        resealed = 0
+        while True:
+            with self.transaction() as cursor:
+                cursor.execute("""
+                    SELECT id, site_name, username, url, notes FROM credentials
+                    WHERE username_index IS NULL
+                    ORDER BY id
+                    LIMIT ?
+                """, (batch_size,))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                updates = []
+                for cred_id, site_name, *fields in rows:
+                    username, url, notes = (
+                        field_crypto.open_value(cred_id, context, value)
+                        for value, (_, context) in zip(fields, field_crypto.FIELDS)
+                    )
+                    sealed = field_crypto.seal(cred_id, site_name, username, url, notes)
+                    updates.append((*sealed, cred_id))
+                cursor.executemany("""
+                    UPDATE credentials
+                    SET username = ?, url = ?, notes = ?, username_index = ?, domain_index = ?
+                    WHERE id = ?
+                """, updates)
+                resealed += len(updates)
+
+        if resealed and field_crypto.encrypt_metadata:
+            self._purge_replaced_content()
+        return resealed
+
+    def _purge_replaced_content(self):
+        """
+        Drop copies of overwritten plaintext that SQLite keeps on disk: FTS5
+        deletes only add tombstones to its segments, and freed pages and the
+        WAL still hold old row bytes.
+        """
+        if self.fts_enabled:
+            with self.transaction() as cursor:
+                cursor.execute("INSERT INTO credentials_fts (credentials_fts) VALUES ('optimize')")
+        with self.get_connection() as conn:
+            # VACUUM can't run inside a transaction; the shared lock keeps
+            # other threads out meanwhile
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def set_metadata_encryption(self, enabled: bool):
+        """
+        Turn encryption of usernames, URLs and notes on or off, re-encrypting
+        or decrypting every row.
+
+        Returns:
+            Number of rows rewritten
+        """
+        if self.field_crypto is None:
+            raise RuntimeError("Vault is locked")
+        with self.transaction() as cursor:
+            self.set_setting(self.field_crypto.SETTING, "1" if enabled else "0")
+            # Clearing the indexes marks every row for reseal_credentials()
+            cursor.execute("UPDATE credentials SET username_index = NULL")
+        self.field_crypto.encrypt_metadata = enabled
+        return self.reseal_credentials()
@@ -0,0 +1,106 @@
+from urllib.parse import urlsplit
+from src.core.models import Credential
+
+
+def normalize_username(username: str) -> str:
+    """Form of a username that lookups compare: trimmed and case-folded"""
+    return (username or '').strip().casefold()
+
+
+def normalize_domain(url: str, site_name: str = '') -> str:
+    """
+    Host name a credential belongs to, lowercase and without a leading
+    "www." or trailing dot. Falls back to site_name when it looks like a
+    domain (e.g. "github.com") and there is no URL.
+    """
+    candidate = (url or '').strip()
+    if not candidate:
+        site_name = (site_name or '').strip()
+        if '.' not in site_name or ' ' in site_name:
+            return ''
+        candidate = site_name
+
+    # urlsplit only finds the host after "//"
+    if '//' not in candidate:
+        candidate = '//' + candidate
+    try:
+        host = urlsplit(candidate).hostname or ''
+    except ValueError:
+        return ''
+
+    host = host.rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+class FieldCrypto:
+    """
+    Optional encryption of credential metadata under the vault's data key.
+
+    username, url and notes are stored as AEAD envelopes bound to the row id
+    and column when encrypt_metadata is on. Either way every row carries
+    keyed blind indexes (HMAC of the normalized username and domain), so
+    exact-match lookups stay indexed without decrypting anything. Rows with
+    no domain store NULL rather than a shared HMAC of ''.
+    site_name stays plaintext: it drives ordering, paging and full-text search.
+    """
+    # Setting holding "1" when metadata is encrypted
+    SETTING = "encrypt_metadata"
+
+    # Encrypted columns and the context each is bound to
+    FIELDS = (("username", b"username"), ("url", b"url"), ("notes", b"notes"))
+
+    def __init__(self, session, encrypt_metadata: bool = False):
+        self.session = session
+        self.encrypt_metadata = encrypt_metadata
+
+    @classmethod
+    def for_vault(cls, db, session):
+        """FieldCrypto configured from db's settings"""
+        return cls(session, db.get_setting(cls.SETTING) == "1")
+
+    def username_index(self, username: str) -> bytes:
+        return self.session.blind_index(b"username", normalize_username(username))
+
+    def domain_index(self, url: str, site_name: str = ''):
+        """Blind index of the domain, or None when there is no domain"""
+        domain = normalize_domain(url, site_name)
+        return self.session.blind_index(b"domain", domain) if domain else None
+
+    def empty_domain_index(self) -> bytes:
+        """The index earlier versions stored for rows without a domain"""
+        return self.session.blind_index(b"domain", '')
+
+    def seal(self, cred_id, site_name, username, url, notes):
+        """
+        Values to store for a row's metadata.
+
+        Returns:
+            Tuple of (username, url, notes, username_index, domain_index)
+        """
+        values = [username or '', url or '', notes or '']
+        indexes = (self.username_index(values[0]), self.domain_index(values[1], site_name))
+        if self.encrypt_metadata:
+            values = [
+                self.session.encrypt(value, cred_id, context) if value else value
+                for value, (_, context) in zip(values, self.FIELDS)
+            ]
+        return (*values, *indexes)
+
+    def open_value(self, cred_id, context: bytes, value):
+        """Plaintext of a stored metadata value (BLOBs are encrypted)"""
+        if isinstance(value, bytes):
+            return self.session.decrypt(value, cred_id, context)
+        return value
+
+    def open_row(self, cursor, row):
+        """sqlite3 row_factory like Credential.from_row, decrypting metadata"""
+        cred_id, category, site_name, username, password, favorite, url, notes = row
+        return Credential(
+            cred_id, category, site_name,
+            self.open_value(cred_id, b"username", username),
+            password, favorite,
+            self.open_value(cred_id, b"url", url),
+            self.open_value(cred_id, b"notes", notes),
+        )
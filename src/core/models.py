@@ -0,0 +1,42 @@
+class Credential:
+    """
+    A credential row as loaded from the database.
+
+    Built directly by the sqlite3 row_factory (see DBManager).
+    """
+    __slots__ = (
+        'id', 'category', 'site_name', 'username', 'encrypted_password',
+        'is_favorite', 'url', 'notes',
+    )
+
+    def __init__(self, id, category, site_name, username, encrypted_password,
+                 is_favorite=0, url='', notes=''):
+        self.id = id
+        self.category = category
+        self.site_name = site_name or ''
+        self.username = username or ''
+        self.encrypted_password = encrypted_password
+        self.is_favorite = is_favorite or 0
+        self.url = url or ''
+        self.notes = notes or ''
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """
+        sqlite3 row_factory building a Credential from a row of id, category,
+        site_name, username, encrypted_password, is_favorite, url, notes
+        """
+        return cls(*row)
+
+    @property
+    def sort_key(self):
+        """Display order, matching ORDER BY site_name, id"""
+        return (self.site_name, self.id)
+
+    def __eq__(self, other):
+        if not isinstance(other, Credential):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Credential(id={self.id!r}, site_name={self.site_name!r}, username={self.username!r})"
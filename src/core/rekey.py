@@ -0,0 +1,159 @@
+from src.core.crypto_manager import CryptoSession, KdfParams
+from src.core.vault_keys import DATA_KEY, MASTER_SETTINGS, master_settings, open_password_key
+
+
+class VaultRekey:
+    """
+    Moves every stored password to a new random data key, re-encrypting in
+    bounded batches. Each batch commits together with its checkpoint, so an
+    interrupted run resumes where it stopped.
+
+    This migrates legacy vaults, whose credentials are encrypted with the
+    password key directly, to envelope encryption (see vault_keys). It can
+    change the master password at the same time; once a vault has a data
+    key, password changes are a rewrap and don't need this.
+
+    Until the run finishes, the current master settings stay in effect. The
+    new key is stored wrapped by the old key and vice versa, and a password
+    change keeps the new master settings under rekey_*, so the vault can be
+    unlocked with either password to resume.
+    """
+    BATCH_SIZE = 500
+
+    # Settings holding the in-progress state
+    PREFIX = "rekey_"
+    NEW_KEY = "rekey_new_key"  # new data key wrapped by the old key
+    OLD_KEY = "rekey_old_key"  # old key wrapped by the new data key
+    CHECKPOINT = "rekey_last_id"  # highest credential id already re-encrypted
+    # Plus the new master settings (PREFIX + each of MASTER_SETTINGS) when
+    # the password changes too
+    STATE_KEYS = (NEW_KEY, OLD_KEY, CHECKPOINT,
+                  "rekey_master_salt", "rekey_kdf", "rekey_verifier", "rekey_data_key")
+
+    def __init__(self, db, old_session, new_session):
+        self.db = db
+        self.old_session = old_session
+        self.new_session = new_session
+        # Rows whose token could not be decrypted with the old key; left as-is
+        self.failed_ids = []
+
+    @classmethod
+    def is_pending(cls, db):
+        """Whether an earlier migration was interrupted"""
+        return db.get_setting(cls.CHECKPOINT) is not None
+
+    @classmethod
+    def start(cls, db, old_session, new_password=None, kdf: KdfParams = None):
+        """
+        Record a new migration. Call run() to re-encrypt the vault.
+
+        Args:
+            db: DBManager
+            old_session: CryptoSession for the key credentials are encrypted
+                         under; for a legacy vault, the password key
+            new_password: New master password, or None to keep the current one
+            kdf: Key derivation for the new password. Defaults to
+                 parameters calibrated for this machine.
+        """
+        if cls.is_pending(db):
+            raise RuntimeError("A vault migration is already in progress")
+        if db.get_setting(DATA_KEY) is not None:
+            # Password changes are a rewrap, and encrypted metadata and blind
+            # indexes are keyed by the data key, so it never changes
+            raise RuntimeError("Vault already has a data key")
+
+        new_session = CryptoSession.generate()
+        state = {
+            cls.NEW_KEY: new_session.wrap_with(old_session),
+            cls.OLD_KEY: old_session.wrap_with(new_session),
+            cls.CHECKPOINT: "0",
+        }
+        if new_password is not None:
+            state.update((cls.PREFIX + key, value)
+                         for key, value in master_settings(new_password, new_session, kdf).items())
+        db.set_settings(state)
+        return cls(db, old_session, new_session)
+
+    @classmethod
+    def resume(cls, db, old_session):
+        """Continue an interrupted migration, unlocked with the old key"""
+        new_session = old_session.unwrap(db.get_setting(cls.NEW_KEY))
+        return cls(db, old_session, new_session)
+
+    @classmethod
+    def unlock_with_new_password(cls, db, password):
+        """
+        While a password change is pending, check the password against the
+        new master settings and, if it matches, return a session for the
+        old key.
+
+        Returns:
+            CryptoSession for the old key, or None if the password is wrong
+        """
+        if db.get_setting(cls.PREFIX + "verifier") is None:
+            return None  # Migration without a password change
+
+        password_key = open_password_key(lambda key: db.get_setting(cls.PREFIX + key), password)
+        if password_key is None:
+            return None
+        with password_key, password_key.unwrap(db.get_setting(cls.PREFIX + DATA_KEY)) as new_session:
+            return new_session.unwrap(db.get_setting(cls.OLD_KEY))
+
+    def run(self, progress=None, should_stop=None):
+        """
+        Re-encrypt the remaining credentials and switch to the new data key.
+
+        Args:
+            progress: Called with (done, total) after each batch
+            should_stop: Polled between batches; return True to pause. The
+                         migration stays pending and can be resumed later.
+
+        Returns:
+            CryptoSession for the new key, or None if paused
+        """
+        last_id = int(self.db.get_setting(self.CHECKPOINT))
+        total = self.db.count_credentials()
+        done = self.db.count_credentials(max_id=last_id)
+
+        while True:
+            if should_stop and should_stop():
+                return None
+
+            rows = self.db.get_password_batch(last_id, self.BATCH_SIZE)
+            if not rows:
+                break
+
+            ids = [row[0] for row in rows]
+            plaintexts = self.old_session.decrypt_many((row[1] for row in rows), associated_ids=ids)
+            self.failed_ids.extend(ids[index] for index in plaintexts.errors)
+
+            readable = [(cred_id, value) for cred_id, value in zip(ids, plaintexts.results)
+                        if value is not None]
+            tokens = self.new_session.encrypt_many((value for _, value in readable),
+                                                   associated_ids=[cred_id for cred_id, _ in readable]).results
+            last_id = ids[-1]
+
+            # The batch and its checkpoint commit together
+            with self.db.transaction():
+                self.db.update_passwords_bulk(
+                    (cred_id, token) for (cred_id, _), token in zip(readable, tokens)
+                )
+                self.db.set_setting(self.CHECKPOINT, str(last_id))
+
+            done += len(rows)
+            if progress:
+                progress(done, total)
+
+        self._finish()
+        return self.new_session
+
+    def _finish(self):
+        """Make the new data key current and clear the pending state"""
+        pending = {key: self.db.get_setting(self.PREFIX + key) for key in MASTER_SETTINGS}
+        if pending["verifier"] is None:
+            # Same password: the old key is the password key
+            pending = {DATA_KEY: self.new_session.wrap_with(self.old_session)}
+
+        with self.db.transaction():
+            self.db.set_settings(pending)
+            self.db.delete_settings(self.STATE_KEYS)
@@ -0,0 +1,92 @@
+import time
+from collections import OrderedDict
+
+
+class SecretCache:
+    """
+    Small LRU cache of decrypted passwords, so repeated copy/edit of the same
+    credential skips decryption.
+
+    Entries are keyed by credential id and the stored ciphertext. Every write
+    produces a new ciphertext (fresh nonce), so it identifies the row's
+    revision and an edited password can never be served stale. Plaintext is
+    kept in bytearrays that are zeroed when an entry expires, is evicted or
+    the cache is cleared; the str handed to callers can't be wiped and
+    should not be held on to.
+    """
+    MAX_ENTRIES = 16
+    TTL_SECONDS = 60.0
+
+    def __init__(self, max_entries: int = None, ttl: float = None, clock=time.monotonic):
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self.ttl = self.TTL_SECONDS if ttl is None else ttl
+        self._clock = clock
+        # cred_id -> (ciphertext, plaintext bytearray, expiry), oldest first
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, cred_id: int, token, session) -> str:
+        """
+        Plaintext password for a credential, decrypting with session on a miss.
+
+        Args:
+            token: The credential's encrypted_password
+            session: CryptoSession that encrypted it
+
+        Raises:
+            InvalidToken: If the token doesn't decrypt
+        """
+        self.expire()
+        token = self._token_key(token)
+        entry = self._entries.get(cred_id)
+        if entry is not None and entry[0] == token:
+            self._entries.move_to_end(cred_id)
+            return entry[1].decode()
+        self.put(cred_id, token, session.decrypt_bytes(token, cred_id))
+        return self._entries[cred_id][1].decode()
+
+    def put(self, cred_id: int, token, plaintext):
+        """Cache plaintext (str or bytes) as the password stored in token"""
+        token = self._token_key(token)
+        if isinstance(plaintext, str):
+            plaintext = plaintext.encode()
+        self.invalidate(cred_id)
+        self._entries[cred_id] = (token, bytearray(plaintext), self._clock() + self.ttl)
+        while len(self._entries) > self.max_entries:
+            _, (_, secret, _) = self._entries.popitem(last=False)
+            self._wipe(secret)
+
+    def invalidate(self, cred_id: int):
+        """Drop and wipe a credential's entry, e.g. after it is deleted"""
+        entry = self._entries.pop(cred_id, None)
+        if entry is not None:
+            self._wipe(entry[1])
+
+    def expire(self):
+        """Wipe entries older than the TTL. Returns the number left."""
+        now = self._clock()
+        for cred_id in [cred_id for cred_id, entry in self._entries.items() if entry[2] <= now]:
+            self.invalidate(cred_id)
+        return len(self._entries)
+
+    def next_expiry(self):
+        """Seconds until the next entry expires, or None when empty"""
+        if not self._entries:
+            return None
+        return max(0.0, min(entry[2] for entry in self._entries.values()) - self._clock())
+
+    def clear(self):
+        """Wipe every entry, on lock or exit"""
+        for cred_id in list(self._entries):
+            self.invalidate(cred_id)
+
+    @staticmethod
+    def _token_key(token):
+        # BLOBs may arrive as memoryview; base64 text tokens compare as str
+        return token if isinstance(token, str) else bytes(token)
+
+    @staticmethod
+    def _wipe(secret: bytearray):
+        secret[:] = bytes(len(secret))
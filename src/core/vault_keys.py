@@ -0,0 +1,113 @@
+from typing import NamedTuple
+from cryptography.fernet import InvalidToken
+from src.core.crypto_manager import CryptoManager, CryptoSession, KdfParams, VERIFIER_TEXT
+
+# Envelope encryption: credentials are encrypted under a random data key,
+# stored in this setting wrapped by the key derived from the master password.
+# Vaults created before it existed encrypt credentials with the password key
+# directly until VaultRekey migrates them.
+DATA_KEY = "data_key"
+
+# Settings that describe how the master password unlocks the vault
+MASTER_SETTINGS = ("master_salt", "kdf", "verifier", DATA_KEY)
+
+
+def uses_data_key(db) -> bool:
+    """Whether credentials are encrypted under a wrapped data key"""
+    return db.get_setting(DATA_KEY) is not None
+
+
+def master_settings(password, data_session, kdf: KdfParams = None) -> dict:
+    """
+    Settings that let password unlock data_session's key.
+
+    Args:
+        kdf: Key derivation for the password. Defaults to parameters
+             calibrated for this machine.
+
+    Returns:
+        Dict with a value for each of MASTER_SETTINGS
+    """
+    kdf = kdf or CryptoManager.calibrate_kdf()
+    salt = CryptoManager.generate_salt()
+    with CryptoSession(CryptoManager.derive_key(password, salt, kdf)) as password_key:
+        return {
+            "master_salt": salt.hex(),
+            "kdf": kdf.to_json(),
+            "verifier": password_key.encrypt_text(VERIFIER_TEXT),
+            DATA_KEY: data_session.wrap_with(password_key),
+        }
+
+
+class NewVault(NamedTuple):
+    """A vault from create_vault() that hasn't been written to the database yet"""
+    session: CryptoSession
+    settings: dict
+
+    def close(self):
+        self.session.close()
+
+
+def create_vault(password, kdf: KdfParams = None) -> NewVault:
+    """
+    Generate a data key and the master settings for a new vault. Nothing
+    is stored, so a cancelled setup leaves the database untouched; write
+    settings with db.set_settings() once the vault is accepted.
+    """
+    data_session = CryptoSession.generate()
+    return NewVault(data_session, master_settings(password, data_session, kdf))
+
+
+def open_password_key(settings, password):
+    """
+    Derive the password key described by settings (a dict or a getter)
+    and check it against the verifier.
+
+    Returns:
+        CryptoSession for the password key, or None if the password is wrong
+    """
+    get = settings.get if isinstance(settings, dict) else settings
+    salt = bytes.fromhex(get("master_salt"))
+    kdf = KdfParams.from_json(get("kdf"))
+    password_key = CryptoSession(CryptoManager.derive_key(password, salt, kdf))
+    try:
+        if password_key.decrypt(get("verifier")) == VERIFIER_TEXT:
+            return password_key
+    except InvalidToken:
+        pass
+    password_key.close()
+    return None
+
+
+def check_master_password(db, password) -> bool:
+    """Whether password unlocks the vault's current master settings"""
+    password_key = open_password_key(db.get_setting, password)
+    if password_key is None:
+        return False
+    password_key.close()
+    return True
+
+
+def unlock(db, password):
+    """
+    Returns:
+        CryptoSession for the key credentials are encrypted under (the data
+        key, or the password key itself for a legacy vault), or None if the
+        password is wrong
+    """
+    password_key = open_password_key(db.get_setting, password)
+    wrapped = db.get_setting(DATA_KEY)
+    if password_key is None or wrapped is None:
+        return password_key
+    with password_key:
+        return password_key.unwrap(wrapped)
+
+
+def change_master_password(db, data_session, new_password, kdf: KdfParams = None):
+    """
+    Rewrap the data key for a new master password. Credentials are not
+    touched, so this takes the same time for any vault size.
+    """
+    if not uses_data_key(db):
+        raise RuntimeError("Vault has no data key yet; migrate it with VaultRekey")
+    db.set_settings(master_settings(new_password, data_session, kdf))
@@ -1,9 +1,12 @@
 import sys
 import os
 import base64
-from PySide6.QtWidgets import QApplication, QMessageBox
+from PySide6.QtWidgets import QApplication
 from src.core.db_manager import DBManager
-from src.core.crypto_manager import CryptoManager
+from src.core.async_db import AsyncDBManager
+from src.core import vault_keys
+from src.core.field_crypto import FieldCrypto
+from src.core.rekey import VaultRekey
 from src.ui.login_dialog import LoginDialog
 from src.ui.main_window import MainWindow
 
@@ -29,66 +32,70 @@ def main():
     master_salt_hex = db.get_setting("master_salt")
     verifier = db.get_setting("verifier")
     
-    encryption_key = None
+    session = None
+    async_db = None
+    prefetched = None
     
     if not master_salt_hex or not verifier:
         # --- First Run Setup ---
-        dialog = LoginDialog(is_setup=True)
+        def store_vault(vault):
+            # Credentials are encrypted under a random data key. The settings
+            # hold the salt, KDF parameters tuned to this machine, a verifier
+            # and the data key wrapped by the password-derived key.
+            db.set_settings(vault.settings)
+            return vault.session
+
+        # Key derivation and calibration run on a worker thread inside the
+        # dialog; only the attempt the dialog accepts is written
+        dialog = LoginDialog(is_setup=True, unlock=vault_keys.create_vault, commit=store_vault)
         if dialog.exec() == LoginDialog.Accepted:
-            password = dialog.verified_password
-            
-            # Generate Salt & Key
-            salt = CryptoManager.generate_salt()
-            key = CryptoManager.derive_key(password, salt)
-            
-            # Create Verifier
-            # We encrypt a known string "VERIFIED" with the key.
-            # If we can decrypt it later, the key is correct.
-            ver_token = CryptoManager.encrypt_data("VERIFIED", key)
-            
-            # Store Salt and Verifier
-            # Salt is bytes, store as Hex or Base64
-            db.set_setting("master_salt", salt.hex())
-            db.set_setting("verifier", ver_token.decode('utf-8')) # Store as string
-            
-            encryption_key = key
+            session = dialog.session
         else:
             sys.exit(0) # User cancelled setup
             
     else:
         # --- Login Flow ---
-        salt = bytes.fromhex(master_salt_hex)
-        
-        while True:
-            dialog = LoginDialog(is_setup=False)
-            if dialog.exec() == LoginDialog.Accepted:
-                password = dialog.verified_password
-                
-                # Derive key
-                key_candidate = CryptoManager.derive_key(password, salt)
-                
-                # Verify
-                try:
-                    ver_token_bytes = verifier.encode('utf-8')
-                    decrypted = CryptoManager.decrypt_data(ver_token_bytes, key_candidate)
-                    
-                    if decrypted == "VERIFIED":
-                        encryption_key = key_candidate
-                        break # Success
-                    else:
-                        # Should unlikely happen if decrypt succeeds but wrong text
-                        QMessageBox.critical(None, "Error", "Integrity check failed.")
-                except Exception:
-                    # Decryption failed -> Wrong Password
-                    QMessageBox.warning(None, "Login Failed", "Incorrect Password.")
-            else:
-                sys.exit(0) # User cancelled login
+        # An interrupted password change also accepts the new password
+        rekey_pending = VaultRekey.is_pending(db)
+
+        def unlock(password):
+            session = vault_keys.unlock(db, password)
+            if session is None and rekey_pending:
+                session = VaultRekey.unlock_with_new_password(db, password)
+            return session
+
+        # The stored passwords are encrypted, so the first page can load
+        # while the user types and the key is derived. Encrypted metadata
+        # needs the key, so then it loads after login.
+        async_db = AsyncDBManager(db)
+        if db.get_setting(FieldCrypto.SETTING) != "1":
+            prefetched = async_db.submit(MainWindow.fetch_first_page)
+
+        dialog = LoginDialog(is_setup=False, unlock=unlock)
+        if dialog.exec() == LoginDialog.Accepted:
+            session = dialog.session
+        else:
+            async_db.shutdown()
+            sys.exit(0) # User cancelled login
 
     # 3. Launch Main Window
-    window = MainWindow(db, encryption_key)
+    resume_rekey = VaultRekey.is_pending(db)
+    legacy_vault = not vault_keys.uses_data_key(db)
+    window = MainWindow(db, session, async_db, prefetched)
     window.show()
+
+    if resume_rekey:
+        window.resume_password_change()
+    elif legacy_vault:
+        # Move credentials under a data key so password changes become a rewrap
+        window.migrate_to_data_key()
     
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    # The window swaps in a new session if the master password changed
+    window.crypto.close()
+    db.compact_changelog()
+    db.close()
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,373 @@
+from bisect import bisect_left
+from PySide6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PySide6.QtCore import Qt, Signal, QAbstractListModel, QModelIndex, QRect, QSize, QUrl, QEvent
+from PySide6.QtGui import QColor, QFont, QPainter, QPen, QDesktopServices
+
+# Same icons as CredentialCard
+CATEGORY_ICONS = {
+    'General': '📋',
+    'Social': '👥',
+    'Work': '💼',
+    'Finance': '💰',
+    'Entertainment': '🎮'
+}
+
+
+def open_url(url):
+    """Open a credential's URL in the default browser"""
+    if url:
+        url = url if url.startswith(('http://', 'https://')) else 'https://' + url
+        QDesktopServices.openUrl(QUrl(url))
+
+
+def _ranges(rows):
+    """Sorted row numbers grouped into (first, last) runs"""
+    ranges = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return ranges
+
+
+def _increasing_run(values):
+    """Values of a longest strictly increasing subsequence (unordered), in O(n log n)"""
+    tails = []  # index into values of the smallest tail for each length
+    tail_values = []
+    previous = [None] * len(values)
+    for i, value in enumerate(values):
+        position = bisect_left(tail_values, value)
+        if position:
+            previous[i] = tails[position - 1]
+        if position == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[position] = i
+            tail_values[position] = value
+
+    run = []
+    i = tails[-1] if tails else None
+    while i is not None:
+        run.append(values[i])
+        i = previous[i]
+    return run
+
+
+class CredentialListModel(QAbstractListModel):
+    """Flat list model of Credential records for CredentialGridView"""
+    CredentialRole = Qt.UserRole + 1
+
+    # Insert/remove ranges above which apply_credentials() resets instead
+    MAX_OPERATIONS = 64
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.credentials = []
+        self._rows = {}  # cred_id -> row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.credentials)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        credential = self.credentials[index.row()]
+        if role == self.CredentialRole:
+            return credential
+        if role == Qt.DisplayRole:
+            return credential.site_name
+        if role == Qt.ToolTipRole:
+            return credential.url or None
+        return None
+
+    def set_credentials(self, credentials):
+        self.beginResetModel()
+        self.credentials = list(credentials)
+        self._rows = {credential.id: row for row, credential in enumerate(self.credentials)}
+        self.endResetModel()
+
+    def append_credentials(self, credentials):
+        if not credentials:
+            return
+        start = len(self.credentials)
+        self.beginInsertRows(QModelIndex(), start, start + len(credentials) - 1)
+        for row, credential in enumerate(credentials, start):
+            self.credentials.append(credential)
+            self._rows[credential.id] = row
+        self.endInsertRows()
+
+    def apply_credentials(self, credentials):
+        """
+        Change the rows to credentials with few model operations, keyed by
+        credential id: rows that are gone or out of order are removed, new
+        and moved ones inserted, each as contiguous ranges, and dataChanged
+        is emitted only for rows whose values changed. Views keep their
+        scroll position and repaint just the affected cards.
+        """
+        credentials = list(credentials)
+        if len(credentials) == len(self.credentials) and all(
+                new.id == old.id for new, old in zip(credentials, self.credentials)):
+            # Same rows in the same order, the usual case after an edit
+            self._refresh(credentials)
+            return
+        old_rows = {credential.id: row for row, credential in enumerate(self.credentials)}
+
+        # Rows already in the right relative order stay put; the others move
+        kept = [old_rows[credential.id] for credential in credentials if credential.id in old_rows]
+        staying = {self.credentials[row].id for row in _increasing_run(kept)}
+        removed = [row for row, credential in enumerate(self.credentials) if credential.id not in staying]
+        inserted = [row for row, credential in enumerate(credentials) if credential.id not in staying]
+        if len(_ranges(removed)) + len(_ranges(inserted)) > self.MAX_OPERATIONS:
+            # Mostly different (e.g. another filter): a reset is cheaper
+            self.set_credentials(credentials)
+            return
+
+        for first, last in reversed(_ranges(removed)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.credentials[first:last + 1]
+            self.endRemoveRows()
+
+        for first, last in _ranges(inserted):
+            self.beginInsertRows(QModelIndex(), first, last)
+            self.credentials[first:first] = credentials[first:last + 1]
+            self.endInsertRows()
+
+        self._rows = {credential.id: row for row, credential in enumerate(self.credentials)}
+        self._refresh(credentials)
+
+    def _refresh(self, credentials):
+        """Take credentials' records for rows with the same ids, repainting edited ones"""
+        for row, credential in enumerate(credentials):
+            current = self.credentials[row]
+            if current is not credential:
+                self.credentials[row] = credential
+                if current != credential:
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+
+    def row_of(self, cred_id):
+        """Row showing a credential, or None"""
+        return self._rows.get(cred_id)
+
+
+class CredentialCardDelegate(QStyledItemDelegate):
+    """
+    Paints a credential as a card matching CredentialCard, and turns clicks
+    on its painted buttons into signals. No widgets exist per card.
+    """
+    copy_clicked = Signal(int, object)  # cred_id, encrypted_password (bytes)
+    edit_clicked = Signal(int)  # cred_id
+    delete_clicked = Signal(int)  # cred_id
+    favorite_clicked = Signal(int)  # cred_id
+
+    CARD_HEIGHT = 220
+    PADDING_X = 20
+    PADDING_Y = 16
+    BUTTON_HEIGHT = 36
+    BUTTON_SPACING = 8
+    LINE_HEIGHT = 22
+
+    def __init__(self, theme_manager=None, parent=None):
+        super().__init__(parent)
+        self.theme_manager = theme_manager
+        self.card_width = 240
+
+    def _color(self, key, default):
+        return QColor(self.theme_manager.get_color(key) if self.theme_manager else default)
+
+    def sizeHint(self, option, index):
+        return QSize(self.card_width, self.CARD_HEIGHT)
+
+    def regions(self, rect, credential):
+        """
+        Clickable areas of a card painted in rect.
+
+        Returns:
+            Dict of name ("favorite", "url", "copy", "edit", "delete") to QRect
+        """
+        inner = rect.adjusted(self.PADDING_X, self.PADDING_Y, -self.PADDING_X, -self.PADDING_Y)
+        size = self.BUTTON_HEIGHT
+        regions = {
+            'favorite': QRect(inner.right() - size + 1, inner.top(), size, size),
+        }
+        if credential.url:
+            # Below the title, divider and username rows
+            top = inner.top() + size + 10 + 28 + 10 + self.LINE_HEIGHT + 4
+            regions['url'] = QRect(inner.left(), top, inner.width(), self.LINE_HEIGHT)
+
+        bottom = inner.bottom() - size + 1
+        delete = QRect(inner.right() - size + 1, bottom, size, size)
+        half = (delete.left() - inner.left() - 2 * self.BUTTON_SPACING) // 2
+        regions['copy'] = QRect(inner.left(), bottom, half, size)
+        regions['edit'] = QRect(inner.left() + half + self.BUTTON_SPACING, bottom, half, size)
+        regions['delete'] = delete
+        return regions
+
+    def hit_test(self, rect, credential, pos):
+        """Name of the clickable region at pos, or None"""
+        for name, region in self.regions(rect, credential).items():
+            if region.contains(pos):
+                return name
+        return None
+
+    def paint(self, painter, option, index):
+        credential = index.data(CredentialListModel.CredentialRole)
+        rect = option.rect.adjusted(0, 0, -1, -1)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        regions = self.regions(option.rect, credential)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Card background and border
+        painter.setBrush(self._color('bg_elevated', '#313244'))
+        if hovered:
+            painter.setPen(QPen(self._color('accent_primary', '#a78bfa'), 2))
+        else:
+            painter.setPen(QPen(self._color('border_light', '#313244'), 1))
+        painter.drawRoundedRect(rect, 12, 12)
+
+        inner = option.rect.adjusted(self.PADDING_X, self.PADDING_Y, -self.PADDING_X, -self.PADDING_Y)
+        text_width = inner.width() - self.BUTTON_HEIGHT - 10
+        font = QFont(option.font)
+
+        # Top row: category icon and badge, favorite star
+        font.setPointSize(14)
+        painter.setFont(font)
+        painter.setPen(self._color('text_secondary', '#bac2de'))
+        top = QRect(inner.left(), inner.top(), text_width, self.BUTTON_HEIGHT)
+        icon = CATEGORY_ICONS.get(credential.category, '📋')
+        painter.drawText(top, Qt.AlignVCenter | Qt.AlignLeft,
+                         painter.fontMetrics().elidedText(f"{icon} {credential.category}",
+                                                          Qt.ElideRight, top.width()))
+        painter.drawText(regions['favorite'], Qt.AlignCenter, "⭐" if credential.is_favorite else "☆")
+
+        # Site name
+        y = inner.top() + self.BUTTON_HEIGHT + 10
+        font.setPointSize(16)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(self._color('text_primary', '#cdd6f4'))
+        title = QRect(inner.left(), y, inner.width(), 28)
+        painter.drawText(title, Qt.AlignVCenter | Qt.AlignLeft,
+                         painter.fontMetrics().elidedText(credential.site_name, Qt.ElideRight, title.width()))
+
+        # Divider
+        y += 28 + 5
+        painter.setPen(self._color('border_light', '#313244'))
+        painter.drawLine(inner.left(), y, inner.right(), y)
+        y += 5
+
+        # Username, URL and notes lines
+        font.setBold(False)
+        font.setPointSize(11)
+        painter.setFont(font)
+        lines = [(f"👤 {credential.username}", 'text_secondary', '#bac2de')]
+        if credential.url:
+            lines.append((f"🌐 {credential.url}", 'accent_primary', '#a78bfa'))
+        if credential.notes:
+            lines.append((f"📝 {credential.notes}", 'text_tertiary', '#6c7086'))
+        for text, color, default in lines:
+            line = QRect(inner.left(), y, inner.width(), self.LINE_HEIGHT)
+            painter.setPen(self._color(color, default))
+            painter.drawText(line, Qt.AlignVCenter | Qt.AlignLeft,
+                             painter.fontMetrics().elidedText(text, Qt.ElideRight, line.width()))
+            y += self.LINE_HEIGHT + 4
+
+        # Action buttons
+        painter.setPen(QPen(self._color('border_light', '#313244'), 1))
+        painter.setBrush(self._color('bg_secondary', '#181825'))
+        for name, label in (('copy', "📋 Copy"), ('edit', "✏️ Edit")):
+            painter.drawRoundedRect(regions[name], 8, 8)
+            painter.save()
+            painter.setPen(self._color('text_primary', '#cdd6f4'))
+            painter.drawText(regions[name], Qt.AlignCenter, label)
+            painter.restore()
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self._color('accent_danger', '#f87171'))
+        painter.drawRoundedRect(regions['delete'], 8, 8)
+        painter.setPen(QColor('white'))
+        painter.drawText(regions['delete'], Qt.AlignCenter, "🗑️")
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QEvent.MouseButtonRelease or event.button() != Qt.LeftButton:
+            return False
+        credential = index.data(CredentialListModel.CredentialRole)
+        region = self.hit_test(option.rect, credential, event.position().toPoint())
+        if region == 'copy':
+            self.copy_clicked.emit(credential.id, credential.encrypted_password)
+        elif region == 'edit':
+            self.edit_clicked.emit(credential.id)
+        elif region == 'delete':
+            self.delete_clicked.emit(credential.id)
+        elif region == 'favorite':
+            self.favorite_clicked.emit(credential.id)
+        elif region == 'url':
+            open_url(credential.url)
+        return region is not None
+
+
+class CredentialGridView(QListView):
+    """
+    Virtualized card grid: only cards in the viewport are painted, so memory
+    and layout cost don't grow with the number of credentials.
+    """
+    MIN_CARD_WIDTH = 240
+    MAX_COLUMNS = 5
+    SPACING = 20
+
+    def __init__(self, delegate, parent=None):
+        super().__init__(parent)
+        self.delegate = delegate
+        self.setItemDelegate(delegate)
+        self.setViewMode(QListView.IconMode)
+        self.setFlow(QListView.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setFrameShape(QListView.NoFrame)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WA_Hover)
+        self.setStyleSheet("QListView { background: transparent; }")
+        self.columns = 0
+
+    def cards_per_row(self, width):
+        """Same column rule as the widget grid"""
+        available = width - 2 * self.SPACING
+        cards = 1
+        while cards < self.MAX_COLUMNS:
+            if self.MIN_CARD_WIDTH * (cards + 1) + self.SPACING * cards > available:
+                break
+            cards += 1
+        return cards
+
+    def update_grid(self):
+        """Size the cells so the columns fill the viewport width"""
+        width = self.viewport().width()
+        self.columns = self.cards_per_row(width)
+        cell_width = max(self.MIN_CARD_WIDTH, (width - self.SPACING) // self.columns)
+        self.delegate.card_width = cell_width - self.SPACING
+        self.setGridSize(QSize(cell_width, self.delegate.CARD_HEIGHT + self.SPACING))
+
+    def resizeEvent(self, event):
+        self.update_grid()
+        super().resizeEvent(event)
+
+    def mouseMoveEvent(self, event):
+        # Pointing hand over the painted buttons
+        pos = event.position().toPoint()
+        index = self.indexAt(pos)
+        region = None
+        if index.isValid():
+            credential = index.data(CredentialListModel.CredentialRole)
+            region = self.delegate.hit_test(self.visualRect(index), credential, pos)
+        self.viewport().setCursor(Qt.PointingHandCursor if region else Qt.ArrowCursor)
+        super().mouseMoveEvent(event)
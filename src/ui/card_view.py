@@ -1,31 +1,29 @@
 from functools import partial
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QScrollArea, QFrame, QGridLayout, QSizePolicy
+    QPushButton, QScrollArea, QFrame, QGridLayout, QSizePolicy, QStackedWidget
 )
-from PySide6.QtCore import Qt, Signal, QUrl, QTimer
-from PySide6.QtGui import QFont, QDesktopServices, QCursor
+from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtGui import QFont, QCursor
 from src.utils.password_utils import PasswordStrengthChecker
+from src.ui.card_grid import (
+    CATEGORY_ICONS, CredentialListModel, CredentialCardDelegate, CredentialGridView, open_url
+)
 
 
 class CredentialCard(QFrame):
-    """A single credential card widget"""
-    copy_clicked = Signal(str)  # encrypted_password
+    """
+    A single credential card widget. set_credential() rebinds it to another
+    credential, so CardViewWidget can reuse cards instead of rebuilding them.
+    """
+    copy_clicked = Signal(int, object)  # cred_id, encrypted_password (bytes)
     edit_clicked = Signal(int)  # cred_id
     delete_clicked = Signal(int)  # cred_id
     favorite_clicked = Signal(int)  # cred_id
 
-    def __init__(self, cred_data, parent=None):
+    def __init__(self, credential, parent=None):
         super().__init__(parent)
-        # cred_data: (id, category, site, user, enc_pass, is_favorite, url, notes)
-        self.cred_id = cred_data[0]
-        self.category = cred_data[1]
-        self.site_name = cred_data[2]
-        self.username = cred_data[3]
-        self.encrypted_password = cred_data[4]
-        self.is_favorite = cred_data[5] if len(cred_data) > 5 else 0
-        self.url = cred_data[6] if len(cred_data) > 6 else ""
-        self.notes = cred_data[7] if len(cred_data) > 7 else ""
+        self.credential = credential
 
         self.setFrameStyle(QFrame.StyledPanel | QFrame.Raised)
         self.setLineWidth(1)
@@ -37,6 +35,7 @@ class CredentialCard(QFrame):
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
 
         self._init_ui()
+        self.set_credential(credential)
 
     def _init_ui(self):
         layout = QVBoxLayout()
@@ -51,53 +50,45 @@ class CredentialCard(QFrame):
         category_container = QHBoxLayout()
         category_container.setSpacing(4)
 
-        category_icons = {
-            'General': '📋',
-            'Social': '👥',
-            'Work': '💼',
-            'Finance': '💰',
-            'Entertainment': '🎮'
-        }
-
-        icon_label = QLabel(category_icons.get(self.category, '📋'))
+        self.icon_label = QLabel()
         icon_font = QFont()
         icon_font.setPointSize(20)
-        icon_label.setFont(icon_font)
-        category_container.addWidget(icon_label)
+        self.icon_label.setFont(icon_font)
+        category_container.addWidget(self.icon_label)
 
         # Category name badge
-        category_badge = QLabel(self.category)
-        category_badge.setObjectName("categoryBadge")
+        self.category_badge = QLabel()
+        self.category_badge.setObjectName("categoryBadge")
         category_badge_font = QFont()
         category_badge_font.setPointSize(20)
-        category_badge.setFont(category_badge_font)
-        category_container.addWidget(category_badge)
+        self.category_badge.setFont(category_badge_font)
+        category_container.addWidget(self.category_badge)
         category_container.addStretch()
 
         top_layout.addLayout(category_container, 1)
 
         # Favorite button
-        self.favorite_btn = QPushButton("⭐" if self.is_favorite else "☆")
+        self.favorite_btn = QPushButton()
         self.favorite_btn.setObjectName("iconBtn")
         self.favorite_btn.setFixedSize(36, 36)
         self.favorite_btn.setCursor(Qt.PointingHandCursor)
         self.favorite_btn.setToolTip("Toggle Favorite")
-        self.favorite_btn.clicked.connect(lambda: self.favorite_clicked.emit(self.cred_id))
+        self.favorite_btn.clicked.connect(lambda: self.favorite_clicked.emit(self.credential.id))
         top_layout.addWidget(self.favorite_btn)
 
         layout.addLayout(top_layout)
 
         # Site name (prominent)
-        site_label = QLabel(self.site_name)
-        site_label.setObjectName("cardTitle")
+        self.site_label = QLabel()
+        self.site_label.setObjectName("cardTitle")
         site_font = QFont()
         site_font.setPointSize(18)
         site_font.setBold(True)
-        site_label.setFont(site_font)
-        site_label.setWordWrap(False)
+        self.site_label.setFont(site_font)
+        self.site_label.setWordWrap(False)
         # Enable text elision
-        site_label.setTextFormat(Qt.PlainText)
-        layout.addWidget(site_label)
+        self.site_label.setTextFormat(Qt.PlainText)
+        layout.addWidget(self.site_label)
 
         # Divider line
         divider = QFrame()
@@ -115,62 +106,58 @@ class CredentialCard(QFrame):
         username_icon.setFont(username_icon_font)
         username_container.addWidget(username_icon)
 
-        username_label = QLabel(self.username)
-        username_label.setObjectName("cardUsername")
-        username_label.setWordWrap(False)
+        self.username_label = QLabel()
+        self.username_label.setObjectName("cardUsername")
+        self.username_label.setWordWrap(False)
         username_label_font = QFont()
         username_label_font.setPointSize(11)
-        username_label.setFont(username_label_font)
-        username_container.addWidget(username_label, 1)
+        self.username_label.setFont(username_label_font)
+        username_container.addWidget(self.username_label, 1)
         username_container.addStretch()
 
         layout.addLayout(username_container)
 
-        # URL (if exists) - make it clickable
-        if self.url:
-            url_container = QHBoxLayout()
-            url_container.setSpacing(6)
-            url_icon = QLabel("🌐")
-            url_icon_font = QFont()
-            url_icon_font.setPointSize(12)
-            url_icon.setFont(url_icon_font)
-            url_container.addWidget(url_icon)
-
-            self.url_label = QLabel(self._truncate_url(self.url, 35))
-            self.url_label.setObjectName("cardUrl")
-            self.url_label.setWordWrap(False)
-            self.url_label.setCursor(Qt.PointingHandCursor)
-            self.url_label.setToolTip(f"Click to open: {self.url}")
-            self.url_label.mousePressEvent = lambda event: self._open_url()
-            url_label_font = QFont()
-            url_label_font.setPointSize(10)
-            self.url_label.setFont(url_label_font)
-            url_container.addWidget(self.url_label, 1)
-            url_container.addStretch()
-
-            layout.addLayout(url_container)
-
-        # Notes preview (if exists)
-        if self.notes:
-            notes_container = QHBoxLayout()
-            notes_container.setSpacing(6)
-            notes_icon = QLabel("📝")
-            notes_icon_font = QFont()
-            notes_icon_font.setPointSize(12)
-            notes_icon.setFont(notes_icon_font)
-            notes_container.addWidget(notes_icon)
-
-            notes_preview = self.notes[:40] + "..." if len(self.notes) > 40 else self.notes
-            notes_label = QLabel(notes_preview)
-            notes_label.setObjectName("cardNotes")
-            notes_label.setWordWrap(True)
-            notes_label.setMaximumHeight(40)
-            notes_label_font = QFont()
-            notes_label_font.setPointSize(9)
-            notes_label.setFont(notes_label_font)
-            notes_container.addWidget(notes_label, 1)
-
-            layout.addLayout(notes_container)
+        # URL (shown if set) - make it clickable
+        url_container = QHBoxLayout()
+        url_container.setSpacing(6)
+        self.url_icon = QLabel("🌐")
+        url_icon_font = QFont()
+        url_icon_font.setPointSize(12)
+        self.url_icon.setFont(url_icon_font)
+        url_container.addWidget(self.url_icon)
+
+        self.url_label = QLabel()
+        self.url_label.setObjectName("cardUrl")
+        self.url_label.setWordWrap(False)
+        self.url_label.setCursor(Qt.PointingHandCursor)
+        self.url_label.mousePressEvent = lambda event: self._open_url()
+        url_label_font = QFont()
+        url_label_font.setPointSize(10)
+        self.url_label.setFont(url_label_font)
+        url_container.addWidget(self.url_label, 1)
+        url_container.addStretch()
+
+        layout.addLayout(url_container)
+
+        # Notes preview (shown if set)
+        notes_container = QHBoxLayout()
+        notes_container.setSpacing(6)
+        self.notes_icon = QLabel("📝")
+        notes_icon_font = QFont()
+        notes_icon_font.setPointSize(12)
+        self.notes_icon.setFont(notes_icon_font)
+        notes_container.addWidget(self.notes_icon)
+
+        self.notes_label = QLabel()
+        self.notes_label.setObjectName("cardNotes")
+        self.notes_label.setWordWrap(True)
+        self.notes_label.setMaximumHeight(40)
+        notes_label_font = QFont()
+        notes_label_font.setPointSize(9)
+        self.notes_label.setFont(notes_label_font)
+        notes_container.addWidget(self.notes_label, 1)
+
+        layout.addLayout(notes_container)
 
         layout.addStretch()
 
@@ -183,21 +170,22 @@ class CredentialCard(QFrame):
         btn_copy.setMinimumHeight(36)
         btn_copy.setCursor(Qt.PointingHandCursor)
         btn_copy.setToolTip("Copy Password to Clipboard")
-        btn_copy.clicked.connect(lambda: self.copy_clicked.emit(self.encrypted_password))
+        btn_copy.clicked.connect(lambda: self.copy_clicked.emit(
+            self.credential.id, self.credential.encrypted_password))
 
         btn_edit = QPushButton("✏️ Edit")
         btn_edit.setObjectName("cardActionBtn")
         btn_edit.setMinimumHeight(36)
         btn_edit.setCursor(Qt.PointingHandCursor)
         btn_edit.setToolTip("Edit Credential")
-        btn_edit.clicked.connect(lambda: self.edit_clicked.emit(self.cred_id))
+        btn_edit.clicked.connect(lambda: self.edit_clicked.emit(self.credential.id))
 
         btn_delete = QPushButton("🗑️")
         btn_delete.setObjectName("dangerBtn")
         btn_delete.setFixedSize(36, 36)
         btn_delete.setCursor(Qt.PointingHandCursor)
         btn_delete.setToolTip("Delete Credential")
-        btn_delete.clicked.connect(lambda: self.delete_clicked.emit(self.cred_id))
+        btn_delete.clicked.connect(lambda: self.delete_clicked.emit(self.credential.id))
 
         action_layout.addWidget(btn_copy, 1)
         action_layout.addWidget(btn_edit, 1)
@@ -207,6 +195,25 @@ class CredentialCard(QFrame):
 
         self.setLayout(layout)
 
+    def set_credential(self, credential):
+        """Show another credential (or updated data) in this card"""
+        self.credential = credential
+        self.icon_label.setText(CATEGORY_ICONS.get(credential.category, '📋'))
+        self.category_badge.setText(credential.category)
+        self.update_favorite(credential.is_favorite)
+        self.site_label.setText(credential.site_name)
+        self.username_label.setText(credential.username)
+
+        self.url_label.setText(self._truncate_url(credential.url, 35))
+        self.url_label.setToolTip(f"Click to open: {credential.url}")
+        self.url_icon.setVisible(bool(credential.url))
+        self.url_label.setVisible(bool(credential.url))
+
+        notes = credential.notes
+        self.notes_label.setText(notes[:40] + "..." if len(notes) > 40 else notes)
+        self.notes_icon.setVisible(bool(notes))
+        self.notes_label.setVisible(bool(notes))
+
     def _truncate_url(self, url, max_length):
         """Truncate URL intelligently"""
         if len(url) <= max_length:
@@ -224,13 +231,10 @@ class CredentialCard(QFrame):
 
     def _open_url(self):
         """Open URL in default browser"""
-        if self.url:
-            url = self.url if self.url.startswith(('http://', 'https://')) else 'https://' + self.url
-            QDesktopServices.openUrl(QUrl(url))
+        open_url(self.credential.url)
 
     def update_favorite(self, is_favorite):
         """Update favorite button display"""
-        self.is_favorite = is_favorite
         self.favorite_btn.setText("⭐" if is_favorite else "☆")
 
     def enterEvent(self, event):
@@ -245,17 +249,36 @@ class CredentialCard(QFrame):
 
 
 class CardViewWidget(QWidget):
-    """Container widget for displaying credentials as cards in a grid"""
-    copy_password = Signal(str)  # encrypted_password
+    """
+    Container widget for displaying credentials as cards in a grid.
+
+    Up to VIRTUALIZE_THRESHOLD credentials are shown as CredentialCard
+    widgets; beyond that a CredentialGridView paints only the visible cards.
+    """
+    copy_password = Signal(int, object)  # cred_id, encrypted_password (bytes)
     edit_credential = Signal(int)  # cred_id
     delete_credential = Signal(int)  # cred_id
     toggle_favorite = Signal(int)  # cred_id
+    load_more_requested = Signal()  # scrolled near the end of the loaded cards
 
-    def __init__(self, parent=None):
+    # Distance from the bottom (px) at which the next page is requested
+    LOAD_MORE_THRESHOLD = 400
+
+    # Card count above which the virtualized grid replaces the widget grid
+    VIRTUALIZE_THRESHOLD = 200
+
+    # Hidden cards kept for reuse when fewer cards are shown
+    SPARE_CARDS = VIRTUALIZE_THRESHOLD
+
+    def __init__(self, parent=None, theme_manager=None):
         super().__init__(parent)
+        self.theme_manager = theme_manager
         self.cards = []
+        self.spare_cards = []
+        self.empty_state = None
         self.current_data = []
         self.last_cards_per_row = 0
+        self.stretch_row = 0
         self.resize_timer = QTimer()
         self.resize_timer.setSingleShot(True)
         self.resize_timer.timeout.connect(self._on_resize_complete)
@@ -273,6 +296,11 @@ class CardViewWidget(QWidget):
         self.scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
 
+        # Request more data as the user scrolls towards the bottom
+        scroll_bar = self.scroll.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self._check_load_more)
+        scroll_bar.rangeChanged.connect(self._check_load_more)
+
         # Container for cards
         self.card_container = QWidget()
         self.card_layout = QGridLayout()
@@ -288,15 +316,91 @@ class CardViewWidget(QWidget):
         self.card_container.setLayout(self.card_layout)
 
         self.scroll.setWidget(self.card_container)
-        main_layout.addWidget(self.scroll)
+
+        # Virtualized grid for large vaults
+        self.grid_model = CredentialListModel(self)
+        self.grid_delegate = CredentialCardDelegate(self.theme_manager, self)
+        self.grid_delegate.copy_clicked.connect(self.copy_password.emit)
+        self.grid_delegate.edit_clicked.connect(self.edit_credential.emit)
+        self.grid_delegate.delete_clicked.connect(self.delete_credential.emit)
+        self.grid_delegate.favorite_clicked.connect(self.toggle_favorite.emit)
+        self.grid_view = CredentialGridView(self.grid_delegate)
+        self.grid_view.setModel(self.grid_model)
+        self.grid_view.setViewportMargins(self.grid_view.SPACING // 2, self.grid_view.SPACING // 2, 0, 0)
+
+        grid_scroll_bar = self.grid_view.verticalScrollBar()
+        grid_scroll_bar.valueChanged.connect(self._check_load_more)
+        grid_scroll_bar.rangeChanged.connect(self._check_load_more)
+
+        self.stack = QStackedWidget()
+        self.stack.addWidget(self.scroll)
+        self.stack.addWidget(self.grid_view)
+        main_layout.addWidget(self.stack)
 
         self.setLayout(main_layout)
 
+    @property
+    def virtualized(self):
+        """Whether the virtualized grid is showing the cards"""
+        return self.stack.currentWidget() is self.grid_view
+
+    def _set_virtualized(self, virtualized):
+        if virtualized == self.virtualized:
+            return
+        if virtualized:
+            self._clear_cards()
+        else:
+            self.grid_model.set_credentials([])
+        self.stack.setCurrentWidget(self.grid_view if virtualized else self.scroll)
+
     def set_data(self, credentials):
-        """Populate cards with credential data"""
+        """
+        Show credentials, diffed against the cards already shown by
+        credential id: unchanged cards are left alone, edited ones rebound
+        and only cards whose position changed are moved.
+        """
         # Store data for re-layout on resize
-        self.current_data = credentials
-        self._layout_cards()
+        self.current_data = list(credentials)
+        if len(self.current_data) > self.VIRTUALIZE_THRESHOLD:
+            if self.virtualized:
+                self.grid_model.apply_credentials(self.current_data)
+            else:
+                self._set_virtualized(True)
+                self.grid_model.set_credentials(self.current_data)
+        else:
+            self._set_virtualized(False)
+            self._layout_cards()
+        QTimer.singleShot(0, self._check_load_more)
+
+    def append_data(self, credentials):
+        """Add cards for another page of credentials below the existing ones"""
+        if not credentials:
+            return
+        if not self.current_data:
+            self.set_data(credentials)
+            return
+        if self.virtualized:
+            self.current_data.extend(credentials)
+            self.grid_model.append_credentials(credentials)
+            return
+        if len(self.current_data) + len(credentials) > self.VIRTUALIZE_THRESHOLD:
+            self.set_data(self.current_data + list(credentials))
+            return
+
+        start = len(self.current_data)
+        self.current_data.extend(credentials)
+        for i, credential in enumerate(credentials, start):
+            self._add_card(i, credential, self.last_cards_per_row)
+        self._update_row_stretch(self.last_cards_per_row)
+        QTimer.singleShot(0, self._check_load_more)
+
+    def _check_load_more(self, *args):
+        """Emit load_more_requested when the view is scrolled near its end"""
+        if not self.current_data:
+            return
+        scroll_bar = (self.grid_view if self.virtualized else self.scroll).verticalScrollBar()
+        if scroll_bar.value() >= scroll_bar.maximum() - self.LOAD_MORE_THRESHOLD:
+            self.load_more_requested.emit()
 
     def _calculate_cards_per_row(self):
         """Calculate how many cards fit per row based on current width"""
@@ -323,51 +427,36 @@ class CardViewWidget(QWidget):
         return max(1, cards)
 
     def _layout_cards(self):
-        """Layout cards in grid based on current data"""
+        """
+        Lay out cards for current_data. Cards already showing a credential
+        keep it and stay in place unless their grid cell changed; cards no
+        longer needed are rebound to the new ones, so filtering, edits and
+        resizing reuse widgets instead of rebuilding them.
+        """
         # Calculate cards per row
         cards_per_row = self._calculate_cards_per_row()
+        columns_changed = cards_per_row != self.last_cards_per_row
         self.last_cards_per_row = cards_per_row
 
-        # Clear existing cards
-        self._clear_cards()
+        shown = {card.credential.id: (i, card) for i, card in enumerate(self.cards)}
+        wanted = {credential.id for credential in self.current_data}
+        self.cards = []
+        for cred_id, (_, card) in shown.items():
+            if cred_id not in wanted:
+                self.card_layout.removeWidget(card)
+                self._release_card(card)
 
         if not self.current_data:
             # Show empty state
-            empty_widget = QWidget()
-            empty_layout = QVBoxLayout(empty_widget)
-            empty_layout.setAlignment(Qt.AlignCenter)
-
-            empty_icon = QLabel("📭")
-            empty_icon_font = QFont()
-            empty_icon_font.setPointSize(64)
-            empty_icon.setFont(empty_icon_font)
-            empty_icon.setAlignment(Qt.AlignCenter)
-
-            empty_text = QLabel("No credentials found")
-            empty_text.setAlignment(Qt.AlignCenter)
-            empty_text.setObjectName("emptyStateTitle")
-            empty_text_font = QFont()
-            empty_text_font.setPointSize(18)
-            empty_text_font.setBold(True)
-            empty_text.setFont(empty_text_font)
-
-            empty_hint = QLabel("Click '+ Add Credential' to create your first credential")
-            empty_hint.setAlignment(Qt.AlignCenter)
-            empty_hint.setObjectName("emptyStateHint")
-            empty_hint_font = QFont()
-            empty_hint_font.setPointSize(12)
-            empty_hint.setFont(empty_hint_font)
-
-            empty_layout.addStretch()
-            empty_layout.addWidget(empty_icon)
-            empty_layout.addSpacing(20)
-            empty_layout.addWidget(empty_text)
-            empty_layout.addSpacing(10)
-            empty_layout.addWidget(empty_hint)
-            empty_layout.addStretch()
-
-            self.card_layout.addWidget(empty_widget, 0, 0, 1, cards_per_row)
+            if self.empty_state is None:
+                self.empty_state = self._create_empty_state()
+            self.card_layout.removeWidget(self.empty_state)
+            self.card_layout.addWidget(self.empty_state, 0, 0, 1, cards_per_row)
+            self.empty_state.show()
             return
+        if self.empty_state is not None:
+            self.card_layout.removeWidget(self.empty_state)
+            self.empty_state.hide()
 
         # Update column stretch based on cards per row
         for i in range(5):
@@ -376,38 +465,118 @@ class CardViewWidget(QWidget):
             else:
                 self.card_layout.setColumnStretch(i, 0)
 
-        # Create and add cards
-        for i, cred_data in enumerate(self.current_data):
-            card = CredentialCard(cred_data, self)
-
-            # Connect signals
-            card.copy_clicked.connect(self.copy_password.emit)
-            card.edit_clicked.connect(self.edit_credential.emit)
-            card.delete_clicked.connect(self.delete_credential.emit)
-            card.favorite_clicked.connect(self.toggle_favorite.emit)
+        # Place cards, reusing the one already showing each credential
+        for i, credential in enumerate(self.current_data):
+            position, card = shown.get(credential.id, (None, None))
+            if position == i and not columns_changed:
+                # Same cell: at most the data changed
+                if card.credential != credential:
+                    card.set_credential(credential)
+                card.credential = credential
+                self.cards.append(card)
+                continue
+            if card is not None:
+                self.card_layout.removeWidget(card)
+            self._add_card(i, credential, cards_per_row, card)
+
+        self._update_row_stretch(cards_per_row)
+
+    def _create_empty_state(self):
+        """Placeholder shown when there are no credentials"""
+        empty_widget = QWidget()
+        empty_layout = QVBoxLayout(empty_widget)
+        empty_layout.setAlignment(Qt.AlignCenter)
+
+        empty_icon = QLabel("📭")
+        empty_icon_font = QFont()
+        empty_icon_font.setPointSize(64)
+        empty_icon.setFont(empty_icon_font)
+        empty_icon.setAlignment(Qt.AlignCenter)
+
+        empty_text = QLabel("No credentials found")
+        empty_text.setAlignment(Qt.AlignCenter)
+        empty_text.setObjectName("emptyStateTitle")
+        empty_text_font = QFont()
+        empty_text_font.setPointSize(18)
+        empty_text_font.setBold(True)
+        empty_text.setFont(empty_text_font)
+
+        empty_hint = QLabel("Click '+ Add Credential' to create your first credential")
+        empty_hint.setAlignment(Qt.AlignCenter)
+        empty_hint.setObjectName("emptyStateHint")
+        empty_hint_font = QFont()
+        empty_hint_font.setPointSize(12)
+        empty_hint.setFont(empty_hint_font)
+
+        empty_layout.addStretch()
+        empty_layout.addWidget(empty_icon)
+        empty_layout.addSpacing(20)
+        empty_layout.addWidget(empty_text)
+        empty_layout.addSpacing(10)
+        empty_layout.addWidget(empty_hint)
+        empty_layout.addStretch()
+        return empty_widget
+
+    def _add_card(self, index, credential, cards_per_row, card=None):
+        """Place a card for credential at the given grid index"""
+        if card is None:
+            card = self._acquire_card(credential)
+        elif card.credential != credential:
+            card.set_credential(credential)
+        card.credential = credential
+        self.cards.append(card)
+
+        # Add to grid
+        row = index // cards_per_row
+        col = index % cards_per_row
+        self.card_layout.addWidget(card, row, col)
+        card.show()
+
+    def _acquire_card(self, credential):
+        """A pooled card rebound to credential, or a new one"""
+        if self.spare_cards:
+            card = self.spare_cards.pop()
+            card.set_credential(credential)
+            return card
+        return self._create_card(credential)
+
+    def _release_card(self, card):
+        """Hide a card that is no longer shown, keeping it for reuse"""
+        if len(self.spare_cards) < self.SPARE_CARDS:
+            card.hide()
+            self.spare_cards.append(card)
+        else:
+            card.deleteLater()
 
-            self.cards.append(card)
+    def _create_card(self, credential):
+        """Create a card with its signals forwarded to this widget"""
+        card = CredentialCard(credential, self)
 
-            # Add to grid
-            row = i // cards_per_row
-            col = i % cards_per_row
-            self.card_layout.addWidget(card, row, col)
+        # Connect signals
+        card.copy_clicked.connect(self.copy_password.emit)
+        card.edit_clicked.connect(self.edit_credential.emit)
+        card.delete_clicked.connect(self.delete_credential.emit)
+        card.favorite_clicked.connect(self.toggle_favorite.emit)
+        return card
 
-        # Add stretch to push cards to top
+    def _update_row_stretch(self, cards_per_row):
+        """Add stretch below the last row to push cards to top"""
         total_rows = (len(self.current_data) - 1) // cards_per_row + 1
+        self.card_layout.setRowStretch(self.stretch_row, 0)
         self.card_layout.setRowStretch(total_rows, 1)
+        self.stretch_row = total_rows
 
     def resizeEvent(self, event):
         """Handle resize events to adjust card layout"""
         super().resizeEvent(event)
 
-        # Use timer to debounce resize events
-        if self.current_data:
+        # Use timer to debounce resize events (the grid view sizes itself)
+        if self.current_data and not self.virtualized:
             self.resize_timer.start(150)  # Wait 150ms after last resize
 
     def _on_resize_complete(self):
         """Called when resize is complete (debounced)"""
-        if not self.current_data:
+        if not self.current_data or self.virtualized:
             return
 
         # Only re-layout if cards per row changed
@@ -416,25 +585,39 @@ class CardViewWidget(QWidget):
             self._layout_cards()
 
     def _clear_cards(self):
-        """Remove all cards from layout"""
-        for card in self.cards:
+        """Remove and delete all cards, including the reuse pool"""
+        for card in self.cards + self.spare_cards:
             card.deleteLater()
         self.cards.clear()
+        self.spare_cards.clear()
 
         # Clear layout
         while self.card_layout.count():
             item = self.card_layout.takeAt(0)
             if item.widget():
                 item.widget().deleteLater()
+        self.empty_state = None
 
     def clear_cards(self):
         """Public method to remove all cards"""
         self._clear_cards()
+        self.grid_model.set_credentials([])
         self.current_data = []
 
     def update_favorite_status(self, cred_id, is_favorite):
         """Update favorite status for a specific card"""
+        if self.virtualized:
+            row = self.grid_model.row_of(cred_id)
+            if row is not None:
+                # Rows are shared with current_data
+                self.grid_model.credentials[row].is_favorite = is_favorite
+                index = self.grid_model.index(row)
+                self.grid_model.dataChanged.emit(index, index)
+            return
+
         for card in self.cards:
-            if card.cred_id == cred_id:
+            if card.credential.id == cred_id:
+                # Shared with current_data, like the virtualized rows
+                card.credential.is_favorite = is_favorite
                 card.update_favorite(is_favorite)
                 break
@@ -0,0 +1,143 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+    QPushButton, QMessageBox, QProgressBar
+)
+from PySide6.QtCore import Qt, QObject, Signal
+from src.utils.password_utils import PasswordStrengthChecker
+
+
+class RekeyProgress(QObject):
+    """
+    Relays re-encryption progress from the database worker thread to the
+    GUI thread (the signal is delivered queued).
+    """
+    progress = Signal(int, int)  # done, total
+    status = Signal(str)  # Label for the step now running
+
+
+class ChangePasswordDialog(QDialog):
+    """Asks for the current master password and a new one"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("🔑 Change Master Password")
+        self.setMinimumSize(420, 320)
+        self.current_password = None
+        self.new_password = None
+
+        self._init_ui()
+
+    def _init_ui(self):
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+        layout.setContentsMargins(32, 32, 32, 32)
+
+        instruction = QLabel("The new master password will protect your vault's encryption key. "
+                             "Stored passwords are not re-encrypted, so this is quick for any vault size.")
+        instruction.setObjectName("captionLabel")
+        instruction.setWordWrap(True)
+        layout.addWidget(instruction)
+
+        self.input_current = self._password_field("Current Password")
+        self.input_new = self._password_field("New Password")
+        self.input_new.textChanged.connect(self._update_strength)
+        self.input_confirm = self._password_field("Confirm New Password")
+        for field in (self.input_current, self.input_new, self.input_confirm):
+            layout.addWidget(field)
+
+        # Password strength meter
+        self.strength_bar = QProgressBar()
+        self.strength_bar.setMaximum(100)
+        self.strength_bar.setValue(0)
+        self.strength_bar.setTextVisible(False)
+        self.strength_bar.setFixedHeight(8)
+        self.strength_bar.setObjectName("strengthWeak")
+        layout.addWidget(self.strength_bar)
+
+        self.strength_label = QLabel("Password Strength: Weak")
+        self.strength_label.setObjectName("captionLabel")
+        self.strength_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.strength_label)
+
+        layout.addStretch()
+
+        # Buttons
+        btn_layout = QHBoxLayout()
+        btn_layout.setSpacing(12)
+
+        btn_cancel = QPushButton("Cancel")
+        btn_cancel.setMinimumHeight(40)
+        btn_cancel.setObjectName("secondaryBtn")
+        btn_cancel.clicked.connect(self.reject)
+
+        btn_ok = QPushButton("Change Password")
+        btn_ok.setMinimumHeight(40)
+        btn_ok.setObjectName("primaryBtn")
+        btn_ok.clicked.connect(self.on_ok)
+
+        btn_layout.addWidget(btn_cancel)
+        btn_layout.addWidget(btn_ok)
+        layout.addLayout(btn_layout)
+
+        self.setLayout(layout)
+        self.input_current.setFocus()
+
+    def _password_field(self, placeholder):
+        field = QLineEdit()
+        field.setEchoMode(QLineEdit.Password)
+        field.setPlaceholderText(placeholder)
+        field.setMinimumHeight(40)
+        return field
+
+    def _update_strength(self, password):
+        """Update password strength meter"""
+        strength, score, suggestions = PasswordStrengthChecker.check_strength(password)
+        self.strength_bar.setValue(score)
+
+        if strength == 'weak':
+            self.strength_bar.setObjectName("strengthWeak")
+        elif strength == 'medium':
+            self.strength_bar.setObjectName("strengthMedium")
+        else:
+            self.strength_bar.setObjectName("strengthStrong")
+
+        # Force style update
+        self.strength_bar.style().unpolish(self.strength_bar)
+        self.strength_bar.style().polish(self.strength_bar)
+
+        strength_text = PasswordStrengthChecker.get_strength_text(strength)
+        self.strength_label.setText(f"Password Strength: {strength_text}")
+
+    def on_ok(self):
+        current = self.input_current.text()
+        new = self.input_new.text()
+
+        if not current or not new:
+            QMessageBox.warning(self, "Error", "Password cannot be empty.")
+            return
+
+        if new != self.input_confirm.text():
+            QMessageBox.warning(self, "Error", "Passwords do not match.")
+            return
+
+        if new == current:
+            QMessageBox.warning(self, "Error", "The new password must be different.")
+            return
+
+        strength, score, suggestions = PasswordStrengthChecker.check_strength(new)
+        if strength == 'weak':
+            result = QMessageBox.question(
+                self,
+                "Weak Password",
+                f"Your password is weak (score: {score}/100).\n\nSuggestions:\n" +
+                "\n".join(f"• {s}" for s in suggestions) +
+                "\n\nDo you want to use it anyway?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if result == QMessageBox.No:
+                return
+
+        self.current_password = current
+        self.new_password = new
+        self.accept()
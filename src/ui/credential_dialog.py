@@ -16,14 +16,14 @@ class CredentialDialog(QDialog):
 
         # Initialize with existing data if editing
         if cred_data:
-            # cred_data: (id, category, site, user, enc_pass, is_favorite, url, notes)
-            self.cred_id = cred_data[0]
-            self.category = cred_data[1]
-            self.site_name = cred_data[2]
-            self.username = cred_data[3]
+            # cred_data: Credential record
+            self.cred_id = cred_data.id
+            self.category = cred_data.category
+            self.site_name = cred_data.site_name
+            self.username = cred_data.username
             self.password = ""  # Will be decrypted externally if needed
-            self.url = cred_data[6] if len(cred_data) > 6 else ""
-            self.notes = cred_data[7] if len(cred_data) > 7 else ""
+            self.url = cred_data.url
+            self.notes = cred_data.notes
         else:
             self.cred_id = None
             self.category = "General"
@@ -1,3 +1,4 @@
+import threading
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QMessageBox, QProgressBar, QToolButton
@@ -10,9 +11,32 @@ from src.utils.password_utils import PasswordStrengthChecker
 class LoginDialog(QDialog):
     password_accepted = Signal(str)
 
-    def __init__(self, is_setup: bool = False, parent=None):
+    # Internal: carries an unlock result back to the GUI thread
+    _unlock_finished = Signal(int, object, object)  # attempt, session, exception
+
+    def __init__(self, is_setup: bool = False, unlock=None, commit=None, parent=None):
+        """
+        Args:
+            unlock: Optional callable(password) -> CryptoSession, or None for a
+                    wrong password. It runs on a worker thread while the dialog
+                    shows a busy indicator; on success the dialog accepts with
+                    the result in self.session.
+            commit: Optional callable(result) -> CryptoSession run on the GUI
+                    thread for the attempt being accepted, e.g. to store a
+                    new vault; unlock may then return any result with a
+                    close() method. Cancelled attempts never reach it.
+        """
         super().__init__(parent)
         self.is_setup = is_setup
+        self.unlock = unlock
+        self.commit = commit
+        self.session = None
+
+        # Bumped per attempt; results from cancelled attempts are discarded
+        self.attempt = 0
+        self.busy = False
+        self._unlock_finished.connect(self._on_unlock_finished)
+
         self.setWindowTitle("🔒 PwKeeper - " + ("Setup" if is_setup else "Login"))
         self.setMinimumSize(400, 300)
         self.resize(400, 300)
@@ -118,6 +142,20 @@ class LoginDialog(QDialog):
 
             layout.addLayout(strength_layout)
 
+        # Shown while the key is being derived
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)  # Indeterminate
+        self.busy_bar.setTextVisible(False)
+        self.busy_bar.setFixedHeight(8)
+        self.busy_bar.setVisible(False)
+        layout.addWidget(self.busy_bar)
+
+        self.status_label = QLabel()
+        self.status_label.setObjectName("captionLabel")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setVisible(False)
+        layout.addWidget(self.status_label)
+
         layout.addStretch()
 
         # Buttons
@@ -129,13 +167,13 @@ class LoginDialog(QDialog):
         btn_cancel.setObjectName("secondaryBtn")
         btn_cancel.clicked.connect(self.reject)
 
-        btn_ok = QPushButton("OK")
-        btn_ok.setMinimumHeight(40)
-        btn_ok.setObjectName("primaryBtn")
-        btn_ok.clicked.connect(self.on_ok)
+        self.btn_ok = QPushButton("OK")
+        self.btn_ok.setMinimumHeight(40)
+        self.btn_ok.setObjectName("primaryBtn")
+        self.btn_ok.clicked.connect(self.on_ok)
 
         btn_layout.addWidget(btn_cancel)
-        btn_layout.addWidget(btn_ok)
+        btn_layout.addWidget(self.btn_ok)
 
         layout.addLayout(btn_layout)
 
@@ -216,6 +254,70 @@ class LoginDialog(QDialog):
                 if result == QMessageBox.No:
                     return
 
+        if self.unlock:
+            self._start_unlock(pwd)
+            return
+
         self.verified_password = pwd
         self.password_accepted.emit(pwd)
         self.accept()
+
+    def _start_unlock(self, pwd):
+        """Run self.unlock on a worker thread"""
+        self.attempt += 1
+        attempt = self.attempt
+        self._set_busy(True, "Setting up your vault..." if self.is_setup else "Unlocking...")
+
+        def run():
+            try:
+                self._unlock_finished.emit(attempt, self.unlock(pwd), None)
+            except Exception as e:
+                self._unlock_finished.emit(attempt, None, e)
+
+        # Daemon: a cancelled derivation must not keep the app alive on exit
+        threading.Thread(target=run, name="pwkeeper-kdf", daemon=True).start()
+
+    def _on_unlock_finished(self, attempt, session, error):
+        if attempt != self.attempt:
+            # Cancelled; don't leave the key behind
+            if session is not None:
+                session.close()
+            return
+
+        if error is not None:
+            self._set_busy(False, f"Error: {error}")
+        elif session is None:
+            self._set_busy(False, "Incorrect password.")
+            self.input_pwd.selectAll()
+            self.input_pwd.setFocus()
+        else:
+            if self.commit:
+                try:
+                    session = self.commit(session)
+                except Exception as e:
+                    session.close()
+                    self._set_busy(False, f"Error: {e}")
+                    return
+            self.session = session
+            self.verified_password = self.input_pwd.text()
+            self.password_accepted.emit(self.verified_password)
+            self.accept()
+
+    def _set_busy(self, busy, message=""):
+        self.busy = busy
+        self.busy_bar.setVisible(busy)
+        self.status_label.setText(message)
+        self.status_label.setVisible(bool(message))
+        self.btn_ok.setEnabled(not busy)
+        self.input_pwd.setEnabled(not busy)
+        if self.is_setup:
+            self.input_confirm.setEnabled(not busy)
+
+    def reject(self):
+        """Cancel cancels a running unlock first, then closes the dialog"""
+        if self.busy:
+            self.attempt += 1
+            self._set_busy(False, "Cancelled.")
+            self.input_pwd.setFocus()
+            return
+        super().reject()
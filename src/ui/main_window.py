@@ -1,22 +1,85 @@
+import csv
+import math
 from functools import partial
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QListWidget, QPushButton, QLineEdit, QMessageBox, QToolButton, QLabel
+    QListWidget, QPushButton, QLineEdit, QMessageBox, QToolButton, QLabel,
+    QFileDialog, QProgressBar, QProgressDialog, QCheckBox
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QFont
 from src.ui.credential_dialog import CredentialDialog
 from src.ui.card_view import CardViewWidget
 from src.ui.theme_manager import ThemeManager, ICONS
-from src.core.crypto_manager import CryptoManager
+from src.ui.change_password_dialog import ChangePasswordDialog, RekeyProgress
+from src.core.async_db import AsyncDBManager
+from src.core import vault_keys
+from src.core.credential_index import CredentialIndex
+from src.core.field_crypto import FieldCrypto
+from src.core.secret_cache import SecretCache
+from src.core.rekey import VaultRekey
 from src.utils.clipboard import ClipboardHelper
 
 
 class MainWindow(QMainWindow):
-    def __init__(self, db_manager, encryption_key):
+    # Number of credentials fetched per page as the user scrolls
+    PAGE_SIZE = 60
+
+    # Quiet period after the last keystroke before a search runs
+    SEARCH_DEBOUNCE_MS = 150
+
+    def __init__(self, db_manager, crypto_session, async_db=None, prefetched=None):
+        """
+        Args:
+            async_db: Existing AsyncDBManager for db_manager, if one was
+                      started before the window (e.g. during login)
+            prefetched: Future from fetch_first_page submitted on async_db;
+                        the window shows its result instead of reloading
+        """
         super().__init__()
         self.db_manager = db_manager
-        self.encryption_key = encryption_key
+        self.crypto = crypto_session
+
+        # Every database round trip runs on this worker, off the GUI thread
+        self.db = async_db or AsyncDBManager(db_manager)
+        self.db.setParent(self)
+        self.db.failed.connect(lambda e: QMessageBox.critical(self, "Error", f"Database error: {str(e)}"))
+
+        # Bumped by every full reload so stale pages can be dropped
+        self.load_generation = 0
+        self.loading_more = False
+
+        # Search text the view is showing results for ("" when browsing),
+        # and a counter bumped per search so stale queries are skipped
+        self.active_search = ""
+        self.search_generation = 0
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.run_search)
+
+        # Keyset paging state for the active sidebar filter
+        self.all_data = []
+        self.page_filter = {}
+        self.next_cursor = None
+
+        # The whole vault, built on the worker after each full reload; once
+        # it arrives, sidebar filters and searches are answered from memory
+        self.index = CredentialIndex()
+        self.index_complete = False
+        self.index_generation = 0
+
+        # Last database revision reflected in all_data
+        self.revision = 0
+
+        # Set on close so a running password change pauses after its batch
+        self.stop_rekey = False
+
+        # Recently decrypted passwords, wiped as each one's TTL passes
+        self.secrets = SecretCache()
+        self.secrets_timer = QTimer(self)
+        self.secrets_timer.setSingleShot(True)
+        self.secrets_timer.timeout.connect(self._expire_secrets)
 
         # Initialize theme manager - always use dark mode
         self.theme_manager = ThemeManager('dark')
@@ -29,8 +92,12 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.central_widget)
 
         self.init_ui()
+        self._create_busy_indicator()
         self.apply_theme()
-        self.load_data()
+        # Queued ahead of the first load, so rows come back decrypted
+        self.db.submit(lambda db: self._attach_field_crypto(db, crypto_session),
+                       callback=self._on_field_crypto_attached)
+        self.load_data(prefetched)
 
     def init_ui(self):
         main_layout = QVBoxLayout(self.central_widget)
@@ -79,6 +146,18 @@ class MainWindow(QMainWindow):
         header_layout.addLayout(title_layout)
         header_layout.addStretch()
 
+        self.metadata_checkbox = QCheckBox("Encrypt usernames, URLs && notes")
+        self.metadata_checkbox.setEnabled(False)  # Until the vault has a data key
+        self.metadata_checkbox.toggled.connect(self.set_metadata_encryption)
+        header_layout.addWidget(self.metadata_checkbox)
+
+        btn_password = QPushButton("🔑 Change Master Password")
+        btn_password.setMinimumHeight(36)
+        btn_password.setObjectName("secondaryBtn")
+        btn_password.setCursor(Qt.PointingHandCursor)
+        btn_password.clicked.connect(self.change_master_password)
+        header_layout.addWidget(btn_password)
+
         parent_layout.addWidget(header)
 
     def _create_sidebar(self, parent_layout):
@@ -123,9 +202,10 @@ class MainWindow(QMainWindow):
         search_container.setSpacing(0)
 
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText(f"{ICONS['search']} Search by site or username...")
+        self.search_input.setPlaceholderText(f"{ICONS['search']} Search by site, username, URL or notes...")
         self.search_input.setMinimumHeight(40)
         self.search_input.textChanged.connect(self.search_credentials)
+        self.search_input.returnPressed.connect(self.run_search)
         search_container.addWidget(self.search_input)
 
         # Clear search button
@@ -154,23 +234,201 @@ class MainWindow(QMainWindow):
         btn_add.clicked.connect(self.add_credential)
         top_bar.addWidget(btn_add)
 
+        # Import button
+        btn_import = QPushButton("📥 Import")
+        btn_import.setMinimumHeight(40)
+        btn_import.setObjectName("secondaryBtn")
+        btn_import.setCursor(Qt.PointingHandCursor)
+        btn_import.setToolTip("Import credentials from a CSV file")
+        btn_import.clicked.connect(self.import_from_csv)
+        top_bar.addWidget(btn_import)
+
         right_layout.addLayout(top_bar)
 
         # Card view only
-        self.card_view = CardViewWidget()
+        self.card_view = CardViewWidget(theme_manager=self.theme_manager)
         self.card_view.copy_password.connect(self.copy_password)
         self.card_view.edit_credential.connect(self.edit_credential)
         self.card_view.delete_credential.connect(self.delete_credential)
         self.card_view.toggle_favorite.connect(self.toggle_favorite)
+        self.card_view.load_more_requested.connect(self.load_more)
 
         right_layout.addWidget(self.card_view)
 
         parent_layout.addWidget(right_widget)
 
-    def load_data(self):
-        """Load credentials from database"""
-        self.all_data = self.db_manager.get_all_credentials_extended()
-        self.populate_view(self.all_data)
+    def _create_busy_indicator(self):
+        """Status bar spinner shown while database calls are pending"""
+        self.busy_indicator = QProgressBar()
+        self.busy_indicator.setRange(0, 0)  # Indeterminate
+        self.busy_indicator.setMaximumWidth(120)
+        self.busy_indicator.setMaximumHeight(12)
+        self.busy_indicator.setTextVisible(False)
+        self.busy_indicator.setVisible(False)
+        self.statusBar().addPermanentWidget(self.busy_indicator)
+
+        # Only show it for calls that take long enough to notice
+        self.busy_timer = QTimer(self)
+        self.busy_timer.setSingleShot(True)
+        self.busy_timer.timeout.connect(lambda: self.busy_indicator.setVisible(self.db.pending > 0))
+        self.db.busy_changed.connect(self._on_busy_changed)
+
+    def _on_busy_changed(self, busy):
+        if busy:
+            self.busy_timer.start(200)
+        else:
+            self.busy_timer.stop()
+            self.busy_indicator.setVisible(False)
+
+    def _show_error(self, message):
+        """Build an error callback that reports failures in a dialog"""
+        return lambda e: QMessageBox.critical(self, "Error", f"{message}: {str(e)}")
+
+    @classmethod
+    def fetch_first_page(cls, db, page_filter=None):
+        """Worker-side query for load_data: (revision, (rows, next_cursor))"""
+        revision = db.get_current_revision()
+        return revision, db.get_credentials_page(limit=cls.PAGE_SIZE, **(page_filter or {}))
+
+    @staticmethod
+    def build_index(db):
+        """Worker-side: (revision, CredentialIndex of every credential)"""
+        revision = db.get_current_revision()
+        return revision, CredentialIndex(db.get_all_credentials_extended())
+
+    def load_data(self, prefetched=None):
+        """
+        Load the first page of credentials for the active filter, then
+        rebuild the index of the whole vault on the worker
+        """
+        # A full reload means the indexed rows may be out of date
+        self.index_complete = False
+        self.index_generation += 1
+        generation = self.index_generation
+        self._load_first_page(prefetched)
+        # Queued behind the first page, so the cards show up before it's built
+        self.db.submit(self.build_index, callback=lambda result: self._on_index_built(generation, result))
+
+    def _load_first_page(self, prefetched=None):
+        self.load_generation += 1
+        generation = self.load_generation
+
+        if prefetched is not None:
+            # Usually already finished while the key was being derived
+            def retry(_error):
+                if generation == self.load_generation:
+                    self._load_first_page()
+
+            self.db.deliver(prefetched, callback=lambda result: self._on_data_loaded(generation, result),
+                            error_callback=retry)
+            return
+
+        page_filter = dict(self.page_filter)
+        self.db.submit(lambda db: self.fetch_first_page(db, page_filter),
+                       callback=lambda result: self._on_data_loaded(generation, result))
+
+    def _on_data_loaded(self, generation, result):
+        if generation != self.load_generation:
+            return  # Superseded by a newer load
+        self.revision, (self.all_data, self.next_cursor) = result
+        self.loading_more = False
+        if not self.active_search:
+            self.populate_view(self.all_data)
+
+    def _on_index_built(self, generation, result):
+        if generation != self.index_generation:
+            return  # Superseded by a newer reload
+        revision, self.index = result
+        self.index.metadata_searchable = not self.metadata_checkbox.isChecked()
+        self.index_complete = True
+
+        # Every row is in memory now: drop pages still in flight
+        self.load_generation += 1
+        self.loading_more = False
+        self.next_cursor = None
+        self.all_data = self.index.rows(**self.page_filter)
+        if revision < self.revision:
+            # all_data had changes the index predates; replay them onto it
+            self.revision = revision
+            self.apply_changes()
+        else:
+            self.revision = revision
+
+        if self.active_search:
+            self.run_search()
+        else:
+            self.populate_view(self.all_data)
+
+    def load_more(self):
+        """Fetch the next page when the card view is scrolled near its end"""
+        # Search results are not paged
+        if self.next_cursor is None or self.loading_more or self.active_search:
+            return
+
+        self.loading_more = True
+        generation = self.load_generation
+        self.db.call(
+            'get_credentials_page', self.next_cursor, limit=self.PAGE_SIZE, **self.page_filter,
+            callback=lambda result: self._on_page_loaded(generation, result)
+        )
+
+    def _on_page_loaded(self, generation, result):
+        if generation != self.load_generation:
+            return
+        self.loading_more = False
+        rows, self.next_cursor = result
+        self.all_data.extend(rows)
+        if not self.active_search:
+            self.card_view.append_data(rows)
+
+    def apply_changes(self):
+        """Patch the loaded rows and cards with changes made since the last load"""
+        self.db.call('get_changes_since', self.revision, callback=self._on_changes)
+
+    def _on_changes(self, result):
+        revision, changed, deleted = result
+        self.revision = max(self.revision, revision)
+        if not changed and not deleted:
+            return
+
+        for cred_id in deleted:
+            self.secrets.invalidate(cred_id)
+
+        if self.index_complete:
+            # The index holds every row; the view is a filter over it
+            for cred_id in deleted:
+                self.index.remove(cred_id)
+            self.index.update(changed)
+            self.all_data = self.index.rows(**self.page_filter)
+        else:
+            rows = {row.id: row for row in self.all_data}
+            for cred_id in deleted:
+                rows.pop(cred_id, None)
+            for row in changed:
+                if not self._matches_filter(row) or self._beyond_loaded(row):
+                    rows.pop(row.id, None)
+                else:
+                    rows[row.id] = row
+            self.all_data = sorted(rows.values(), key=lambda r: r.sort_key)
+
+        if self.active_search:
+            # Search results are ranked by the index; just re-run the query
+            self.run_search()
+        else:
+            # set_data diffs by id, so only changed cards are touched
+            self.populate_view(self.all_data)
+
+    def _beyond_loaded(self, row):
+        """Rows past the loaded range are left for a later page"""
+        return self.next_cursor is not None and row.sort_key > self.next_cursor
+
+    def _matches_filter(self, row):
+        """Check whether a row belongs to the active sidebar filter"""
+        if 'category' in self.page_filter and row.category != self.page_filter['category']:
+            return False
+        if self.page_filter.get('favorites_only') and not row.is_favorite:
+            return False
+        return True
 
     def populate_view(self, data):
         """Populate card view with data"""
@@ -185,19 +443,69 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Error", "Site Name, Username, and Password are required!")
                 return
 
-            # Encrypt password
-            try:
-                encrypted = CryptoManager.encrypt_data(pwd, self.encryption_key)
-                encrypted_str = encrypted.decode('utf-8')
-                self.db_manager.add_credential_extended(cat, site, user, encrypted_str, url, notes)
-                self.load_data()
+            def on_added(cred_id):
+                self.apply_changes()
                 self.statusBar().showMessage(f"✓ Credential for '{site}' added successfully!", 3000)
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to save credential: {str(e)}")
+
+            # Encrypted on the worker once the new row's id is known
+            self.db.call('add_credential_extended', cat, site, user, self._sealer(pwd), url, notes,
+                         callback=on_added, error_callback=self._show_error("Failed to save credential"))
+
+    def _sealer(self, password):
+        """Build a callable(cred_id) that encrypts password bound to that row"""
+        session = self.crypto
+        return lambda cred_id: session.encrypt(password, cred_id)
+
+    def import_from_csv(self):
+        """Import credentials from a CSV file with a header row"""
+        path, _ = QFileDialog.getOpenFileName(self, "Import Credentials", "", "CSV Files (*.csv)")
+        if not path:
+            return
+
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                rows = [
+                    (row.get('category') or 'General', row.get('site_name', ''),
+                     row.get('username', ''), row.get('password', ''),
+                     row.get('url', ''), row.get('notes', ''))
+                    for row in csv.DictReader(f)
+                ]
+        except (OSError, csv.Error) as e:
+            QMessageBox.critical(self, "Error", f"Failed to read file: {str(e)}")
+            return
+
+        self.import_credentials(rows)
+
+    def import_credentials(self, rows):
+        """
+        Encrypt and store many credentials at once.
+
+        Args:
+            rows: Iterable of (category, site, username, password, url, notes)
+        """
+        records = [
+            (cat, site, user, self._sealer(pwd), url, notes)
+            for cat, site, user, pwd, url, notes in rows
+            if site and user and pwd
+        ]
+        if not records:
+            QMessageBox.warning(self, "Import", "No valid credentials found to import.")
+            return
+
+        def on_imported(ids):
+            self.apply_changes()
+            self.statusBar().showMessage(f"✓ Imported {len(ids)} credentials!", 3000)
+
+        # One transaction and a single view update for the whole batch
+        self.db.call('add_credentials_bulk', records, callback=on_imported,
+                     error_callback=self._show_error("Failed to import credentials"))
 
     def edit_credential(self, cred_id):
         """Edit existing credential"""
-        cred_data = self.db_manager.get_credential_by_id_extended(cred_id)
+        self.db.call('get_credential_by_id_extended', cred_id, callback=self._open_edit_dialog)
+
+    def _open_edit_dialog(self, cred_data):
+        """Show the edit dialog once the credential has been fetched"""
         if not cred_data:
             QMessageBox.warning(self, "Error", "Credential not found!")
             return
@@ -206,8 +514,7 @@ class MainWindow(QMainWindow):
 
         # Decrypt and set password
         try:
-            encrypted_bytes = cred_data[4].encode('utf-8')
-            decrypted_pwd = CryptoManager.decrypt_data(encrypted_bytes, self.encryption_key)
+            decrypted_pwd = self._reveal(cred_data.id, cred_data.encrypted_password)
             dialog.set_password(decrypted_pwd)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to decrypt password: {str(e)}")
@@ -221,13 +528,21 @@ class MainWindow(QMainWindow):
 
             # Encrypt password
             try:
-                encrypted = CryptoManager.encrypt_data(pwd, self.encryption_key)
-                encrypted_str = encrypted.decode('utf-8')
-                self.db_manager.update_credential_extended(cred_id, cat, site, user, encrypted_str, url, notes)
-                self.load_data()
-                self.statusBar().showMessage(f"✓ Credential for '{site}' updated successfully!", 3000)
+                encrypted = self.crypto.encrypt(pwd, cred_data.id)
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to update credential: {str(e)}")
+                return
+
+            # Copying right after an edit needs no decryption
+            self.secrets.put(cred_data.id, encrypted, pwd)
+            self._expire_secrets()
+
+            def on_updated(_):
+                self.apply_changes()
+                self.statusBar().showMessage(f"✓ Credential for '{site}' updated successfully!", 3000)
+
+            self.db.call('update_credential_extended', cred_data.id, cat, site, user, encrypted, url, notes,
+                         callback=on_updated, error_callback=self._show_error("Failed to update credential"))
 
     def delete_credential(self, cred_id):
         """Delete a credential after confirmation"""
@@ -240,27 +555,52 @@ class MainWindow(QMainWindow):
         )
 
         if reply == QMessageBox.Yes:
-            try:
-                self.db_manager.delete_credential(cred_id)
-                self.load_data()
+            def on_deleted(_):
+                self.apply_changes()
                 self.statusBar().showMessage("✓ Credential deleted successfully!", 3000)
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to delete credential: {str(e)}")
 
-    def copy_password(self, encrypted_pass_str):
+            self.db.call('delete_credential', cred_id, callback=on_deleted,
+                         error_callback=self._show_error("Failed to delete credential"))
+
+    def copy_password(self, cred_id, encrypted_password):
         """Decrypt and copy password to clipboard"""
         try:
-            encrypted_bytes = encrypted_pass_str.encode('utf-8')
-            decrypted = CryptoManager.decrypt_data(encrypted_bytes, self.encryption_key)
+            decrypted = self._reveal(cred_id, encrypted_password)
             ClipboardHelper.copy_with_timeout(decrypted, 10000)
             self.statusBar().showMessage("✓ Password copied! Will clear in 10 seconds.", 5000)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Decryption failed: {str(e)}")
 
+    def _reveal(self, cred_id, encrypted_password):
+        """Decrypted password, from the secret cache when recently used"""
+        decrypted = self.secrets.get(cred_id, encrypted_password, self.crypto)
+        self._expire_secrets()
+        return decrypted
+
+    def _expire_secrets(self):
+        """Wipe expired passwords and wake again when the next one expires"""
+        self.secrets.expire()
+        delay = self.secrets.next_expiry()
+        if delay is None:
+            self.secrets_timer.stop()
+        else:
+            self.secrets_timer.start(math.ceil(delay * 1000))
+
     def toggle_favorite(self, cred_id):
         """Toggle favorite status"""
-        is_favorite = self.db_manager.toggle_favorite(cred_id)
-        self.load_data()
+        self.db.call('toggle_favorite', cred_id,
+                     callback=lambda is_favorite: self._on_favorite_toggled(cred_id, is_favorite))
+
+    def _on_favorite_toggled(self, cred_id, is_favorite):
+        # Repaint just the star; apply_changes() then only drops the card
+        # if it no longer matches the Favorites filter
+        self.card_view.update_favorite_status(cred_id, is_favorite)
+        row = self.index.get(cred_id) if self.index_complete else None
+        if row is not None:
+            # The card view changed the shared row; keep the favorites set in step
+            row.is_favorite = is_favorite
+            self.index.add(row)
+        self.apply_changes()
         self.statusBar().showMessage(
             "⭐ Added to favorites!" if is_favorite else "Removed from favorites",
             2000
@@ -276,31 +616,213 @@ class MainWindow(QMainWindow):
             return
 
         cat_text = item.text()
+        if not cat_text:
+            return  # Separator
 
         # Extract category name (remove emoji)
         if "All" in cat_text:
-            filtered = self.all_data
+            self.page_filter = {}
         elif "Favorites" in cat_text:
-            filtered = self.db_manager.get_favorites()
+            self.page_filter = {'favorites_only': True}
         else:
             # Extract category name after emoji
             category = cat_text.split(' ', 1)[1] if ' ' in cat_text else cat_text
-            filtered = [r for r in self.all_data if r[1] == category]
+            self.page_filter = {'category': category}
 
-        self.populate_view(filtered)
+        if self.index_complete:
+            # Whole vault is in memory: no query needed
+            self.all_data = self.index.rows(**self.page_filter)
+            if not self.active_search:
+                self.populate_view(self.all_data)
+        else:
+            # The index is still being built; page in this filter meanwhile
+            self._load_first_page()
+        if self.active_search:
+            # Narrow the current search to the new filter right away
+            self.run_search()
 
     def search_credentials(self, text):
-        """Search credentials by site name or username"""
-        text = text.lower()
+        """Search as the user types, once input pauses for SEARCH_DEBOUNCE_MS"""
+        self.search_timer.start()
+
+    def run_search(self):
+        """
+        Search within the active sidebar filter on the database worker.
+        Queries superseded before the worker reaches them are skipped, and
+        only the latest query's results are shown. An empty query goes back
+        to the loaded rows without a database round trip.
+        """
+        self.search_timer.stop()
+        self.search_generation += 1
+        generation = self.search_generation
+        text = self.search_input.text().strip()
+
         if not text:
-            self.filter_by_category(self.sidebar.currentRow())
+            if self.active_search:
+                self.active_search = ""
+                self.populate_view(self.all_data)
             return
 
-        filtered = [
-            r for r in self.all_data
-            if text in r[2].lower() or text in r[3].lower()  # site or username
-        ]
-        self.populate_view(filtered)
+        self.active_search = text
+        if self.index_complete:
+            self.populate_view(self.index.search(text, **self.page_filter))
+            return
+
+        page_filter = dict(self.page_filter)
+
+        def search(db):
+            if generation != self.search_generation:
+                return None  # Newer input arrived while this one was queued
+            return db.search(text, **page_filter)
+
+        self.db.submit(search, callback=lambda rows: self._on_search_results(generation, rows),
+                       error_callback=self._show_error("Search failed"))
+
+    def _on_search_results(self, generation, rows):
+        if rows is not None and generation == self.search_generation:
+            self.populate_view(rows)
+
+    @staticmethod
+    def _attach_field_crypto(db, session):
+        """
+        Worker-side: give db the vault's FieldCrypto and fill in blind
+        indexes for rows written without it. Returns _metadata_state(db).
+        Legacy vaults get it after migrate_to_data_key().
+        """
+        if vault_keys.uses_data_key(db):
+            db.field_crypto = FieldCrypto.for_vault(db, session)
+            db.reseal_credentials()
+        return MainWindow._metadata_state(db)
+
+    @staticmethod
+    def _metadata_state(db):
+        """Worker-side: whether metadata is encrypted, or None without a FieldCrypto"""
+        return None if db.field_crypto is None else db.field_crypto.encrypt_metadata
+
+    def _on_field_crypto_attached(self, encrypted):
+        # Disabled while set, so the toggle doesn't rewrite the vault
+        self.metadata_checkbox.setChecked(bool(encrypted))
+        # Encrypted fields aren't in the database's text index either
+        self.index.metadata_searchable = not encrypted
+        self.metadata_checkbox.setEnabled(encrypted is not None)
+
+    def set_metadata_encryption(self, enabled):
+        """Encrypt or decrypt usernames, URLs and notes across the vault"""
+        if not self.metadata_checkbox.isEnabled():
+            return
+
+        def done(_):
+            self.metadata_checkbox.setEnabled(True)
+            self.load_data()
+
+        def failed(error):
+            self._on_field_crypto_attached(not enabled)
+            QMessageBox.critical(self, "Error", f"Could not update metadata encryption: {str(error)}")
+
+        self.metadata_checkbox.setEnabled(False)
+        self.db.call('set_metadata_encryption', enabled, callback=done, error_callback=failed)
+
+    def change_master_password(self):
+        """Switch to a new master password"""
+        dialog = ChangePasswordDialog(self)
+        if dialog.exec() != ChangePasswordDialog.Accepted:
+            return
+
+        current, new = dialog.current_password, dialog.new_password
+        session = self.crypto
+
+        def change(db, should_stop, progress, status):
+            if not vault_keys.check_master_password(db, current):
+                raise ValueError("Current password is incorrect")
+            if vault_keys.uses_data_key(db):
+                # Only the wrapped data key changes
+                status("Re-wrapping the vault key...")
+                vault_keys.change_master_password(db, session, new)
+                return session
+            status("Re-encrypting passwords...")
+            new_session = VaultRekey.start(db, session, new).run(progress, should_stop)
+            if new_session is not None:
+                self._attach_field_crypto(db, new_session)
+            return new_session
+
+        self._run_rekey(change, "Changing Master Password", "Master password changed.",
+                        label="Checking current password...")
+
+    def resume_password_change(self):
+        """Finish a vault migration or password change that was interrupted"""
+        session = self.crypto
+
+        def resume(db, should_stop, progress, _status):
+            new_session = VaultRekey.resume(db, session).run(progress, should_stop)
+            if new_session is not None:
+                self._attach_field_crypto(db, new_session)
+            return new_session
+
+        self._run_rekey(resume, "Re-encrypting Vault", "Vault re-encryption finished.")
+
+    def migrate_to_data_key(self):
+        """Re-encrypt a legacy vault under a wrapped data key"""
+        session = self.crypto
+
+        def migrate(db, should_stop, progress, _status):
+            new_session = VaultRekey.start(db, session).run(progress, should_stop)
+            if new_session is not None:
+                self._attach_field_crypto(db, new_session)
+            return new_session
+
+        self._run_rekey(migrate, "Upgrading Vault", "Vault upgraded to envelope encryption.")
+
+    def _run_rekey(self, job, title, done_message, label="Re-encrypting passwords..."):
+        """
+        Run job(db, should_stop, progress, status) on the database worker
+        behind a progress dialog; status(text) replaces the dialog's label.
+        The job returns the session for the key credentials are now
+        encrypted under, or None if it paused.
+        """
+        progress_dialog = QProgressDialog(label, None, 0, 0, self)
+        progress_dialog.setWindowTitle(title)
+        progress_dialog.setWindowModality(Qt.WindowModal)
+        progress_dialog.setMinimumDuration(0)
+
+        reporter = RekeyProgress(self)
+        reporter.progress.connect(lambda done, total: (
+            progress_dialog.setMaximum(total), progress_dialog.setValue(done)
+        ))
+        reporter.status.connect(progress_dialog.setLabelText)
+
+        def finished(new_session):
+            reporter.deleteLater()
+            progress_dialog.close()
+            self._on_rekey_finished(new_session, done_message)
+
+        def failed(error):
+            reporter.deleteLater()
+            progress_dialog.close()
+            QMessageBox.critical(self, "Error", f"{title} failed: {str(error)}")
+
+        self.db.submit(lambda db: job(db, lambda: self.stop_rekey, reporter.progress.emit, reporter.status.emit),
+                       callback=finished, error_callback=failed)
+
+    def _on_rekey_finished(self, new_session, message):
+        if new_session is None:
+            return  # Paused on close; resumed at next login
+
+        if new_session is not self.crypto:
+            old_session, self.crypto = self.crypto, new_session
+            old_session.close()
+            self.secrets.clear()
+            # Every row's encrypted_password changed
+            self.load_data()
+        # A migrated vault can encrypt metadata now
+        self.db.submit(self._metadata_state, callback=self._on_field_crypto_attached)
+        QMessageBox.information(self, "Success", message)
+
+    def closeEvent(self, event):
+        """Let queued database writes finish before the window closes"""
+        self.stop_rekey = True
+        self.secrets.clear()
+        self.db.shutdown()
+        super().closeEvent(event)
 
     def apply_theme(self):
         """Apply dark theme stylesheet"""
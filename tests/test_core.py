@@ -1,8 +1,21 @@
 import os
+import sqlite3
+import threading
+import time
 import pytest
 import base64
-from src.core.crypto_manager import CryptoManager
-from src.core.db_manager import DBManager
+from cryptography.fernet import InvalidToken
+from src.core.crypto_manager import (
+    CryptoManager, CryptoSession, KdfParams, FORMAT_FERNET, FORMAT_CHACHA20
+)
+from src.core.db_manager import DBManager, MEMORY_DB
+from src.core.async_db import AsyncDBManager
+from src.core.models import Credential
+from src.core import vault_keys
+from src.core.rekey import VaultRekey
+from src.core.credential_index import CredentialIndex
+from src.core.field_crypto import FieldCrypto, normalize_domain
+from src.core.secret_cache import SecretCache
 
 # --- Crypto Tests ---
 def test_salt_generation():
@@ -35,22 +48,111 @@ def test_encrypt_decrypt():
     decrypted = CryptoManager.decrypt_data(encrypted, key)
     assert decrypted == secret_data
 
+def test_kdf_params_and_calibration():
+    salt = CryptoManager.generate_salt()
+    # Vaults without a "kdf" setting keep deriving the same key
+    assert KdfParams.from_json(None) == KdfParams.LEGACY
+    assert CryptoManager.derive_key("pw", salt) == CryptoManager.derive_key("pw", salt, KdfParams.LEGACY)
+
+    scrypt = KdfParams.from_json(KdfParams.scrypt(2 ** 14).to_json())
+    assert scrypt == KdfParams.scrypt(2 ** 14)
+    assert CryptoManager.derive_key("pw", salt, scrypt) != CryptoManager.derive_key("pw", salt)
+
+    # An unreachable target clamps to the floors, never below LEGACY strength
+    assert CryptoManager.calibrate_kdf(KdfParams.PBKDF2, 1e-6) == KdfParams.LEGACY
+    assert CryptoManager.calibrate_kdf(KdfParams.SCRYPT, 1e-6).n == CryptoManager.SCRYPT_MIN_N
+    with pytest.raises(ValueError):
+        KdfParams("md5")
+
+def test_credential_record():
+    cred = Credential(7, "Work", "GitHub", "OctoCat", "blob", None, None, "notes")
+    assert (cred.is_favorite, cred.url) == (0, '')
+    assert cred.sort_key == ("GitHub", 7)
+    assert not hasattr(cred, "__dict__")
+
+def test_crypto_session_round_trip():
+    key = CryptoManager.derive_key("master_password", CryptoManager.generate_salt())
+    session = CryptoSession(key)
+
+    token = session.encrypt("GoogleDeepMind")
+    assert session.decrypt(token) == "GoogleDeepMind"
+    assert session.decrypt(memoryview(token)) == "GoogleDeepMind"
+    assert session.decrypt(session.encrypt_text("GoogleDeepMind")) == "GoogleDeepMind"
+    assert session.decrypt_bytes(session.encrypt(b"\x00raw")) == b"\x00raw"
+
+    # Reads the static helpers' base64 Fernet tokens
+    assert session.decrypt(CryptoManager.encrypt_data("GoogleDeepMind", key).decode()) == "GoogleDeepMind"
+
+    session.close()
+    assert not session.is_open
+    with pytest.raises(RuntimeError):
+        session.decrypt(token)
+
+def test_envelope_binds_row_id_and_reads_fernet():
+    key = CryptoManager.derive_key("pw", CryptoManager.generate_salt())
+    session = CryptoSession(key)
+    legacy = CryptoSession(key, FORMAT_FERNET).encrypt("hunter2")
+
+    token = session.encrypt("hunter2", associated_id=7)
+    assert len(token) < len(legacy)
+    assert session.decrypt(token, 7) == "hunter2"
+    assert session.decrypt(legacy, 7) == "hunter2"  # Old rows still decrypt
+    assert CryptoSession(key, FORMAT_CHACHA20).decrypt(token, 7) == "hunter2"
+
+    # Moved to another row, or tampered with
+    tampered = bytearray(token)
+    tampered[-1] ^= 1
+    for bad, row_id in ((token, 8), (token, None), (bytes(tampered), 7), (token[:10], 7)):
+        with pytest.raises(InvalidToken):
+            session.decrypt(bad, row_id)
+    session.close()
+
+def test_batch_decrypt_reports_failures_in_order():
+    session = CryptoSession(CryptoManager.derive_key("pw", CryptoManager.generate_salt()))
+    secrets = [f"secret-{i}" for i in range(1000)]
+    tokens = session.encrypt_many(secrets).results
+    tokens[3] = b"not-a-token"
+
+    batch = session.decrypt_many(tokens, workers=4)
+    assert not batch.ok
+    assert list(batch.errors) == [3]
+    assert batch.results[3] is None
+    assert batch.results[:3] + batch.results[4:] == secrets[:3] + secrets[4:]
+    session.close()
+
 # --- DB Tests ---
 @pytest.fixture
-def db():
+def db(tmp_path):
     # Setup
-    test_db_path = "test_pwkeeper.db"
-    manager = DBManager(test_db_path)
+    manager = DBManager("test_pwkeeper.db", data_dir=str(tmp_path))
     yield manager
     # Teardown
-    if os.path.exists(test_db_path):
-        os.remove(test_db_path)
+    manager.close()
+
+@pytest.fixture(scope="session")
+def qapp():
+    # Widgets need a QApplication; offscreen unless a display is configured
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
 
 def test_db_settings(db):
     db.set_setting("master_salt", "somesaltvalue")
     val = db.get_setting("master_salt")
     assert val == "somesaltvalue"
 
+def test_settings_cache_sees_external_writes(db):
+    db.set_settings({"theme": "dark", "columns": "3"})
+    assert db.get_preference("theme") == "dark"
+
+    # Another process writing to the same file invalidates the cache
+    other = sqlite3.connect(db.db_path)
+    other.execute("UPDATE settings SET value = 'light' WHERE key = 'theme'")
+    other.commit()
+    other.close()
+    assert db.get_preference("theme") == "light"
+    assert db.get_preference("missing", "default") == "default"
+
 def test_credential_crud(db):
     # Create
     uid = db.add_credential("Social", "Facebook", "jason@gmail.com", "encrypted_blob")
@@ -71,3 +173,560 @@ def test_credential_crud(db):
     # Delete
     db.delete_credential(uid)
     assert len(db.get_all_credentials()) == 0
+
+def test_data_dir_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("PWKEEPER_DATA_DIR", str(tmp_path / "vault"))
+    manager = DBManager()
+    assert manager.db_path == str(tmp_path / "vault" / "password_keeper.db")
+    manager.close()
+
+def test_memory_db_survives_reconnect():
+    manager = DBManager(MEMORY_DB)
+    other = DBManager(MEMORY_DB)
+    manager.add_credential_extended("Work", "GitHub", "octocat", "blob")
+
+    manager.close()  # e.g. reopened on a worker thread
+    assert [c.site_name for c in manager.get_all_credentials_extended()] == ["GitHub"]
+    assert other.get_all_credentials_extended() == []
+
+def test_db_connection_is_reused(db):
+    with db.get_connection() as first:
+        pass
+    db.get_setting("master_salt")
+    with db.get_connection() as second:
+        assert first is second
+        assert second.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_transaction_rolls_back_on_error(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction() as cursor:
+            cursor.execute("INSERT INTO settings (key, value) VALUES ('k', 'v')")
+            raise RuntimeError("boom")
+    assert db.get_setting("k") is None
+
+def test_insert_passes_new_id_to_password_callable(db):
+    first = db.add_credential_extended("Work", "GitHub", "octocat", lambda cred_id: f"sealed-{cred_id}")
+    db.delete_credential(first)
+    # AUTOINCREMENT never reuses the deleted id
+    ids = db.add_credentials_bulk([("Work", f"s{i}", "u", lambda cred_id: f"sealed-{cred_id}")
+                                   for i in range(3)])
+    assert ids == [first + 1, first + 2, first + 3]
+    assert [c.encrypted_password for c in db.get_all_credentials_extended()] == \
+        [f"sealed-{cred_id}" for cred_id in ids]
+
+def test_bulk_credential_operations(db):
+    ids = db.add_credentials_bulk([
+        ("Social", "Facebook", "a@example.com", "blob1"),
+        ("Work", "Slack", "b@example.com", "blob2", "https://slack.com", "team", 1),
+    ])
+    assert len(ids) == 2
+    slack = db.get_credential_by_id_extended(ids[1])
+    assert (slack.is_favorite, slack.url, slack.notes) == (1, "https://slack.com", "team")
+
+    db.update_credentials_bulk([(ids[0], "Social", "Meta", "a@example.com", "blob3", "", "")])
+    assert db.get_credential_by_id_extended(ids[0]).site_name == "Meta"
+
+    db.delete_credentials_bulk(ids)
+    assert db.get_all_credentials_extended() == []
+
+def test_search_prefix_and_ranking(db):
+    db.add_credential_extended("Work", "GitHub", "octocat", "blob", "https://github.com")
+    db.add_credential_extended("Social", "Twitter", "gitfan", "blob", notes="github mirror")
+    db.add_credential_extended("Social", "Facebook", "someone", "blob")
+
+    results = db.search("git")
+    assert [r.site_name for r in results] == ["GitHub", "Twitter"]  # site match ranks first
+
+    db.update_credential_extended(results[0].id, "Work", "Gitea", "octocat", "blob")
+    assert [r.site_name for r in db.search("gitea")] == ["Gitea"]
+
+    db.delete_credential(results[1].id)
+    assert [r.site_name for r in db.search("git")] == ["Gitea"]
+    assert db.search("   ") == []
+
+def test_search_within_category_and_favorites(db, monkeypatch):
+    db.add_credentials_bulk([
+        ("Work" if i % 2 else "Social", f"git-{i:02d}", "user", b"t", "", "", int(i % 3 == 0))
+        for i in range(12)
+    ])
+    for fts in (True, False):
+        monkeypatch.setattr(DBManager, "fts_enabled", fts)
+        assert sorted(r.site_name for r in db.search("git", category="Work", favorites_only=True)) == \
+            ["git-03", "git-09"]
+        assert len(db.search("git", category="Social")) == 6
+        assert len(db.search("git", favorites_only=True, limit=2)) == 2
+
+def test_credential_index_filters_match_a_full_scan():
+    import random
+    rng = random.Random(7)
+    names = ["git", "Mail", "bank", "ab", "x", "Work-Hub"]
+
+    def make(cred_id):
+        return Credential(cred_id, rng.choice(["Work", "Social"]), f"{rng.choice(names)}{cred_id % 4}",
+                          rng.choice(names), b"t", rng.random() < 0.3,
+                          rng.choice(["", "https://git.example.com"]), rng.choice(["", "PIN 12"]))
+
+    rows = {i: make(i) for i in range(60)}
+    index = CredentialIndex(rows.values())
+    for i in range(40):  # Edits, deletes and inserts
+        rows[i * 2] = make(i * 2)
+        index.add(rows[i * 2])
+    for cred_id in range(0, 60, 7):
+        del rows[cred_id]
+        index.remove(cred_id)
+    index.remove(999)
+
+    assert len(index) == len(rows)
+    for category in (None, "Work", "Social", "Missing"):
+        for favorites_only in (False, True):
+            expected = sorted((r for r in rows.values()
+                               if category in (None, r.category) and (r.is_favorite or not favorites_only)),
+                              key=lambda r: r.sort_key)
+            assert index.rows(category, favorites_only) == expected
+    rebuilt = CredentialIndex(rows.values())  # Bulk build matches the edited index
+    for query in ("git", "mail ab", "work-h", "example", "pin 12"):
+        assert rebuilt.search(query, favorites_only=True) == index.search(query, favorites_only=True)
+        assert rebuilt.search(query, category="Work") == index.search(query, category="Work")
+    assert index.search("git", limit=2) == index.search("git")[:2]
+    assert index.search("  ") == []
+
+@pytest.mark.parametrize("encrypted", [False, True])
+def test_credential_index_search_matches_the_database(db, encrypted):
+    db.field_crypto = FieldCrypto.for_vault(db, CryptoSession.generate())
+    db.add_credentials_bulk([
+        ("Work", "GitHub", "octo_cat", b"pw", "https://www.github.com/login", "PIN 1234", 1),
+        ("Work", "git hub mirror", "Ops", b"pw", "", "", 0),
+        ("Social", "hub-git", "someone@mail.example", b"pw", "mail.example", "", 1),
+        ("Social", "Café Noir", "barista", b"pw", "", "croissant", 0),
+        ("General", "Router", "admin", b"pw", "", "", 0),
+        ("General", "github.com", "admin", b"pw", "", "Work account", 1),
+    ])
+    db.set_metadata_encryption(encrypted)
+    rows, _ = db.get_credentials_page(limit=100)
+    index = CredentialIndex(rows, metadata_searchable=not encrypted)
+    index.add(db.get_credential_by_id_extended(rows[0].id))  # Re-indexing is idempotent
+
+    queries = ("hub", "git", "git-hub", "gi hu", "?", "http://", "octo", "cat", "octo_cat",
+               "github.com", "www.github.com", "mail", "pin", "cafe", "CAFÉ", "admin", "work", "zzz")
+    for query in queries:
+        for category, favorites_only in ((None, False), ("Work", False), (None, True), ("Social", True)):
+            found = index.search(query, category=category, favorites_only=favorites_only)
+            expected = db.search(query, category=category, favorites_only=favorites_only)
+            assert sorted(r.id for r in found) == sorted(r.id for r in expected), (query, category)
+    assert [r.site_name for r in index.search("hub")] == ["git hub mirror", "hub-git"]
+
+def test_favorite_toggle_reindexes_before_changes_arrive(db, qapp):
+    from src.ui.main_window import MainWindow
+    ids = db.add_credentials_bulk([("Work", f"site-{i}", "user", b"pw", "", "", 0) for i in range(3)])
+    window = MainWindow(db, CryptoSession.generate())
+    deadline = time.monotonic() + 5
+    while (window.db.pending or not window.index_complete) and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+
+    window._on_favorite_toggled(ids[1], True)
+    favorites = next(i for i in range(window.sidebar.count()) if "Favorites" in window.sidebar.item(i).text())
+    window.sidebar.setCurrentRow(favorites)
+    assert [c.id for c in window.card_view.current_data] == [ids[1]]
+    window.close()
+
+def test_keyset_pagination(db):
+    db.add_credentials_bulk([
+        ("Work" if i % 2 else "Social", f"site-{i:02d}", "user", "blob", "", "", int(i % 3 == 0))
+        for i in range(25)
+    ])
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = db.get_credentials_page(cursor, limit=10)
+        seen.extend(r.site_name for r in rows)
+        if cursor is None:
+            break
+    assert seen == [f"site-{i:02d}" for i in range(25)]
+
+    rows, cursor = db.get_credentials_page(limit=100, category="Work", favorites_only=True)
+    assert [r.site_name for r in rows] == ["site-03", "site-09", "site-15", "site-21"]
+    assert cursor is None
+
+def test_changes_since_revision(db):
+    first = db.add_credential_extended("Work", "GitHub", "octocat", "blob")
+    second = db.add_credential_extended("Social", "Twitter", "bird", "blob")
+    revision = db.get_current_revision()
+
+    db.toggle_favorite(first)
+    db.delete_credential(second)
+    current, changed, deleted = db.get_changes_since(revision)
+
+    assert current > revision
+    assert [(r.id, r.is_favorite) for r in changed] == [(first, 1)]
+    assert deleted == [second]
+    assert db.get_changes_since(current) == (current, [], [])
+
+def test_migrate_legacy_schema(tmp_path):
+    # Schema as created by the first release, before any migrations
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE credentials (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, category TEXT, site_name TEXT,
+            username TEXT, encrypted_password TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT)")
+    conn.executemany(
+        "INSERT INTO credentials (category, site_name, username, encrypted_password) VALUES (?, ?, ?, ?)",
+        (("General", f"site-{i}", f"user{i}", "blob") for i in range(20_000)),
+    )
+    conn.commit()
+    conn.close()
+
+    start = time.perf_counter()
+    db = DBManager(path)
+    elapsed = time.perf_counter() - start
+    print(f"Migrated 20,000 legacy rows in {elapsed * 1000:.0f} ms")
+
+    with db.get_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(DBManager.MIGRATIONS)
+        assert conn.execute("SELECT COUNT(*) FROM credentials WHERE updated_at IS NULL").fetchone()[0] == 0
+    migrated = db.get_credential_by_id_extended(1)
+    assert (migrated.is_favorite, migrated.url, migrated.notes) == (0, '', '')
+    assert [r.site_name for r in db.search("site-19999")] == ["site-19999"]
+    db.close()
+    assert elapsed < 10
+
+def test_migrate_text_ciphertexts_to_blobs(tmp_path, monkeypatch):
+    session = CryptoSession(CryptoManager.derive_key("pw", CryptoManager.generate_salt()))
+    path = str(tmp_path / "text.db")
+    db = DBManager(path)
+    ids = db.add_credentials_bulk([("General", f"s{i}", "u", "placeholder") for i in range(5)])
+    # Rewrite as base64 text, as stored before v6
+    db.update_passwords_bulk((cred_id, session.encrypt_text(f"pw{cred_id}", cred_id)) for cred_id in ids)
+    db.update_passwords_bulk([(ids[0], "not base64!")])
+    with db.transaction() as cursor:
+        cursor.execute("PRAGMA user_version = 5")
+    db.close()
+
+    monkeypatch.setattr(DBManager, "MIGRATION_BATCH_SIZE", 2)
+    db = DBManager(path)
+    rows = {c.id: c.encrypted_password for c in db.get_all_credentials_extended()}
+    assert rows[ids[0]] == "not base64!"
+    for cred_id in ids[1:]:
+        assert isinstance(rows[cred_id], bytes)
+        assert session.decrypt(rows[cred_id], cred_id) == f"pw{cred_id}"
+    db.close()
+
+def test_current_schema_skips_migrations(tmp_path, monkeypatch):
+    path = str(tmp_path / "current.db")
+    DBManager(path).close()
+
+    def fail(self, cursor):
+        raise AssertionError("migration re-ran")
+    monkeypatch.setattr(DBManager, "MIGRATIONS", (fail,) * len(DBManager.MIGRATIONS))
+    DBManager(path).close()
+
+def test_async_db_delivers_results_on_gui_thread(db, qapp):
+    app = qapp
+    async_db = AsyncDBManager(db)
+    busy, results, errors = [], [], []
+    async_db.busy_changed.connect(busy.append)
+
+    async_db.call('add_credential_extended', "Work", "GitHub", "octocat", "blob",
+                  callback=lambda cred_id: results.append((cred_id, threading.current_thread())))
+    async_db.call('no_such_method', error_callback=errors.append)
+
+    deadline = time.monotonic() + 5
+    while async_db.pending and time.monotonic() < deadline:
+        app.processEvents()
+    async_db.shutdown()
+
+    assert results == [(1, threading.main_thread())]
+    assert isinstance(errors[0], AttributeError)
+    assert busy == [True, False]
+
+def test_cancelled_setup_never_stores_the_vault(db, qapp):
+    from src.ui.login_dialog import LoginDialog
+    gate = threading.Event()
+
+    def create(password):
+        gate.wait(5)
+        return vault_keys.create_vault(password, KdfParams.scrypt(2 ** 14))
+
+    stored = []
+
+    def store(vault):
+        stored.append(vault)
+        db.set_settings(vault.settings)
+        return vault.session
+
+    dialog = LoginDialog(is_setup=True, unlock=create, commit=store)
+    dialog._start_unlock("first")
+    dialog.reject()  # Cancel while the key is derived, then retry
+    dialog._start_unlock("second")
+    gate.set()
+    deadline = time.monotonic() + 10
+    while dialog.result() != LoginDialog.Accepted and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+
+    assert len(stored) == 1 and dialog.session is stored[0].session
+    assert vault_keys.unlock(db, "first") is None
+    with vault_keys.unlock(db, "second") as unlocked:
+        assert unlocked.decrypt(dialog.session.encrypt("secret", 1), 1) == "secret"
+
+def test_async_db_drops_callbacks_after_shutdown(db, qapp):
+    async_db = AsyncDBManager(db)
+    chained = []
+    # A callback that queues another call, arriving after shutdown started
+    async_db.call('get_current_revision',
+                  callback=lambda revision: chained.append(async_db.call('get_current_revision')))
+    async_db.shutdown()
+    for _ in range(5):
+        qapp.processEvents()
+        time.sleep(0.01)
+
+    assert chained == []
+    assert async_db.pending == 0
+    assert async_db.call('get_current_revision') is None
+
+def test_rekey_resumes_after_interruption(db, monkeypatch):
+    salt = CryptoManager.generate_salt()
+    old = CryptoSession(CryptoManager.derive_key("old-password", salt))
+    db.set_settings({"master_salt": salt.hex(), "verifier": old.encrypt_text("VERIFIED")})
+    db.add_credentials_bulk([("General", f"site{i}", "user",
+                              lambda cred_id, i=i: old.encrypt(f"pw{i}", cred_id))
+                             for i in range(7)])
+    monkeypatch.setattr(VaultRekey, "BATCH_SIZE", 3)
+
+    # Stop after the first batch, as if the app had closed mid-way
+    batches = []
+    rekey = VaultRekey.start(db, old, "new-password", KdfParams.scrypt(2 ** 14))
+    assert rekey.run(lambda done, total: batches.append(done), lambda: bool(batches)) is None
+    assert VaultRekey.is_pending(db) and vault_keys.check_master_password(db, "old-password")
+
+    # Either password unlocks the pending change
+    assert VaultRekey.unlock_with_new_password(db, "wrong") is None
+    resumed_old = VaultRekey.unlock_with_new_password(db, "new-password")
+    new = VaultRekey.resume(db, resumed_old).run(lambda done, total: batches.append(done))
+
+    assert batches == [3, 6, 7]
+    assert not VaultRekey.is_pending(db)
+    assert KdfParams.from_json(db.get_setting("kdf")) == KdfParams.scrypt(2 ** 14)
+    # Credentials moved to a data key that the new password unwraps
+    unlocked = vault_keys.unlock(db, "new-password")
+    assert vault_keys.uses_data_key(db) and vault_keys.unlock(db, "old-password") is None
+    for session in (new, unlocked):
+        assert [session.decrypt(c.encrypted_password, c.id) for c in db.get_all_credentials_extended()] == \
+            [f"pw{i}" for i in range(7)]
+
+def test_password_change_rewraps_data_key(db):
+    data = CryptoSession.generate()
+    db.set_settings(vault_keys.master_settings("old-password", data, KdfParams.scrypt(2 ** 14)))
+    cred_id = db.add_credential_extended("Work", "GitHub", "octocat", lambda i: data.encrypt("hunter2", i))
+    revision = db.get_current_revision()
+
+    vault_keys.change_master_password(db, data, "new-password", KdfParams.pbkdf2(100_000))
+
+    assert db.get_current_revision() == revision  # No credential rewritten
+    assert vault_keys.unlock(db, "old-password") is None
+    unlocked = vault_keys.unlock(db, "new-password")
+    assert unlocked.decrypt(db.get_credential_by_id_extended(cred_id).encrypted_password, cred_id) == "hunter2"
+
+    # Legacy vaults have no data key to rewrap, and get migrated instead
+    with pytest.raises(RuntimeError):
+        VaultRekey.start(db, unlocked)
+
+def test_blind_index_lookups_on_encrypted_metadata(db):
+    data = CryptoSession.generate()
+    # Written before unlock: no indexes until the reseal
+    legacy_id = db.add_credential_extended("Work", "GitLab", "Octocat ", b"pw", "gitlab.com")
+    db.field_crypto = FieldCrypto.for_vault(db, data)
+    assert db.reseal_credentials() == 1
+    github_id = db.add_credential_extended("Work", "GitHub", "octocat", b"pw",
+                                           "https://www.GitHub.com/login", "2FA on phone")
+
+    assert db.set_metadata_encryption(True) == 2
+    with db.get_connection() as conn:
+        stored = conn.execute("SELECT typeof(username), typeof(url), typeof(notes) FROM credentials "
+                              "WHERE id = ?", (github_id,)).fetchone()
+        plan = " ".join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM credentials WHERE domain_index = ?", (b"",)))
+    assert stored == ("blob", "blob", "blob")
+    assert "idx_credentials_domain_index" in plan
+
+    assert normalize_domain("https://www.GitHub.com./login") == "github.com"
+    assert [c.id for c in db.find_by_username("OCTOCAT")] == [github_id, legacy_id]
+    assert [(c.username, c.url, c.notes) for c in db.find_by_domain("github.com")] == \
+        [("octocat", "https://www.GitHub.com/login", "2FA on phone")]
+    assert [c.id for c in db.search("gitlab.com")] == [legacy_id]
+
+    # Fields are bound to their row and column
+    db.field_crypto = None
+    with pytest.raises(InvalidToken):
+        data.decrypt(db.get_credential_by_id_extended(github_id).url, github_id, b"notes")
+
+    db.field_crypto = FieldCrypto.for_vault(db, data)
+    db.set_metadata_encryption(False)
+    assert db.get_setting(FieldCrypto.SETTING) == "0"
+    assert db.search("phone")[0].id == github_id
+
+def test_rows_without_a_domain_are_not_exact_matches(db):
+    data = CryptoSession.generate()
+    db.field_crypto = FieldCrypto.for_vault(db, data)
+    bare_id = db.add_credential_extended("General", "Router", "admin", b"pw")
+    github_id = db.add_credential_extended("Work", "GitHub", "octocat", b"pw", "github.com")
+
+    # Written by an earlier version: HMAC('') shared by every domainless row
+    with db.transaction() as cursor:
+        cursor.execute("UPDATE credentials SET domain_index = ? WHERE id = ?",
+                       (db.field_crypto.empty_domain_index(), bare_id))
+    db.reseal_credentials()
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT domain_index FROM credentials WHERE id = ?", (bare_id,)).fetchone() == (None,)
+
+    for query in ("?", "/", "#", "@", "http://"):
+        assert db.find_by_domain(query) == []
+        assert bare_id not in [c.id for c in db.search(query)]
+    assert [c.id for c in db.find_by_domain("https://github.com/x")] == [github_id]
+
+def test_encrypting_metadata_leaves_no_plaintext_on_disk(db):
+    db.field_crypto = FieldCrypto.for_vault(db, CryptoSession.generate())
+    secrets = ("zebrauser", "quokka-host.example", "narwhalnote")
+    for i in range(50):
+        db.add_credential_extended("Work", f"Site {i}", f"{secrets[0]}{i}", b"pw",
+                                   f"https://{secrets[1]}/{i}", f"{secrets[2]} {i}")
+
+    db.set_metadata_encryption(True)
+    with db.get_connection() as conn:
+        shadow = b"".join(
+            bytes(str(value), "utf-8") if not isinstance(value, bytes) else value
+            for table in ("credentials_fts_data", "credentials_fts_idx")
+            for row in conn.execute(f"SELECT * FROM {table}") for value in row
+        )
+    db.close()
+    on_disk = b"".join(open(path, "rb").read() for path in (db.db_path, db.db_path + "-wal")
+                       if os.path.exists(path))
+    for secret in secrets:
+        assert secret.encode() not in shadow
+        assert secret.encode() not in on_disk
+
+def test_secret_cache_reuses_until_rewritten_or_expired(monkeypatch):
+    session = CryptoSession.generate()
+    decrypts = []
+    real_decrypt = session.decrypt_bytes
+    monkeypatch.setattr(session, "decrypt_bytes", lambda *args: decrypts.append(args) or real_decrypt(*args))
+    now = [0.0]
+    cache = SecretCache(max_entries=2, ttl=30, clock=lambda: now[0])
+
+    token = session.encrypt("hunter2", 1)
+    assert cache.get(1, token, session) == "hunter2"
+    assert cache.get(1, memoryview(token), session) == "hunter2"
+    assert len(decrypts) == 1
+
+    # A new ciphertext for the row (an edit) misses
+    edited = session.encrypt("hunter3", 1)
+    assert cache.get(1, edited, session) == "hunter3"
+    assert len(decrypts) == 2
+
+    # Evicted and expired entries are zeroed
+    secret = cache._entries[1][1]
+    cache.put(2, b"t2", "a")
+    cache.put(3, b"t3", "b")
+    assert 1 not in cache._entries and secret == bytearray(len("hunter3"))
+    assert cache.next_expiry() == 30
+    now[0] = 31
+    assert cache.expire() == 0 and cache.next_expiry() is None
+    cache.put(4, b"t4", "c")
+    cache.clear()
+    assert len(cache) == 0
+
+def test_window_wipes_revealed_passwords_once_their_ttl_passes(db, qapp):
+    from src.ui.main_window import MainWindow
+    session = CryptoSession.generate()
+    window = MainWindow(db, session)
+    window.secrets = SecretCache(ttl=0.1)
+    assert window._reveal(1, session.encrypt("hunter2", 1)) == "hunter2"
+    secret = window.secrets._entries[1][1]
+    assert window.secrets_timer.isActive() and window.secrets_timer.interval() <= 100
+
+    deadline = time.monotonic() + 0.3
+    while time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    assert len(window.secrets) == 0 and secret == bytearray(len("hunter2"))
+    assert not window.secrets_timer.isActive()
+    window.close()
+
+def test_card_grid_model_and_delegate_hit_testing(qapp):
+    from PySide6.QtCore import QPoint, QRect
+    from src.ui.card_grid import CredentialListModel, CredentialCardDelegate
+
+    model = CredentialListModel()
+    model.set_credentials([Credential(1, "Work", "GitHub", "octocat", b"t1")])
+    model.append_credentials([Credential(2, "Work", "GitLab", "tanuki", b"t2", url="gitlab.com")])
+    changed = []
+    model.dataChanged.connect(lambda first, last: changed.append(first.row()))
+    model.apply_credentials([model.credentials[0], Credential(2, "Work", "GitLab", "fox", b"t3", url="gitlab.com")])
+    assert model.rowCount() == 2 and changed == [1]
+    assert model.data(model.index(1), CredentialListModel.CredentialRole).username == "fox"
+
+    delegate = CredentialCardDelegate()
+    rect = QRect(0, 0, 300, delegate.CARD_HEIGHT)
+    regions = delegate.regions(rect, model.credentials[1])
+    assert set(regions) == {"favorite", "url", "copy", "edit", "delete"}
+    assert all(rect.contains(region) for region in regions.values())
+    assert "url" not in delegate.regions(rect, model.credentials[0])
+    assert delegate.hit_test(rect, model.credentials[1], regions["copy"].center()) == "copy"
+    assert delegate.hit_test(rect, model.credentials[1], QPoint(150, 60)) is None
+
+def test_card_view_reuses_cards_across_set_data(qapp):
+    from src.ui.card_view import CardViewWidget, CredentialCard
+    view = CardViewWidget()
+    resets = []
+    view.grid_model.modelReset.connect(lambda: resets.append(1))
+    credentials = [Credential(i, "Work", f"site{i}", f"user{i}", b"t", url="x.com" if i % 2 else "")
+                   for i in range(1, 21)]
+    view.set_data(credentials)
+    cards = {card.credential.id: card for card in view.cards}
+
+    # Filtering keeps the cards still shown and pools the rest
+    view.set_data(credentials[:5])
+    assert [cards[i] for i in range(1, 6)] == view.cards
+    assert len(view.spare_cards) == 15
+
+    # New credentials are bound to pooled cards instead of new widgets
+    view.set_data([Credential(100, "Social", "New", "someone", b"t")] + credentials[:5])
+    assert view.cards[0] in cards.values() and view.cards[0].site_label.text() == "New"
+    assert view.cards[0].url_label.isHidden()
+    assert len(view.findChildren(CredentialCard)) == 20
+    assert not resets  # Small sets never touch the virtualized grid
+    view.deleteLater()
+
+def test_keyed_diff_applies_minimal_updates(qapp):
+    from src.ui.card_grid import CredentialListModel
+    from src.ui.card_view import CardViewWidget
+    credentials = [Credential(i, "Work", f"site{i:03d}", "user", b"t") for i in range(100)]
+    model = CredentialListModel()
+    model.set_credentials(credentials)
+    signals = []
+    for name in ("rowsInserted", "rowsRemoved", "dataChanged", "modelReset"):
+        getattr(model, name).connect(lambda *args, name=name: signals.append(name))
+
+    # Rename moves one row to the end, one is deleted, one edited, one added
+    edited = credentials[1:50] + credentials[51:]
+    edited[9] = Credential(10, "Work", "site010", "new-user", b"t")
+    edited += [Credential(0, "Work", "zzz", "user", b"t"), Credential(200, "Work", "zzz2", "user", b"t")]
+    model.apply_credentials(edited)
+    assert [c.id for c in model.credentials] == [c.id for c in edited]
+    assert sorted(signals) == ["dataChanged", "rowsInserted", "rowsRemoved", "rowsRemoved"]
+    assert model.row_of(200) == len(edited) - 1
+
+    # Widget grid: unchanged cards keep their widget and cell
+    view = CardViewWidget()
+    view.set_data(credentials[:20])
+    cards = list(view.cards)
+    view.set_data(credentials[:19] + [Credential(19, "Work", "site019", "renamed", b"t")])
+    assert view.cards == cards and cards[19].username_label.text() == "renamed"
+    assert view.card_layout.getItemPosition(view.card_layout.indexOf(cards[5]))[:2] == \
+        (5 // view.last_cards_per_row, 5 % view.last_cards_per_row)
+    view.deleteLater()